@@ -1,34 +1,56 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from datetime import datetime, timezone
-import httpx
+import orjson
+
+from app.core.metrics import registry
 
 
 router = APIRouter()
 
+# Constant payloads are encoded once at import and served as raw bytes.
+HEALTH_PAYLOAD = orjson.dumps({"status": "ok", "message": "Service is running smoothly 🚀"})
+PROFILE_USER_PAYLOAD = orjson.dumps({
+    "email": "oloyedeibrahimsmile@gmail.com",
+    "name": "Ibrahim Oloyede",
+    "stack": "Django / FastAPI / PostgreSQL"
+})
+
 
 @router.get("/health")
-def health_check():
-    return {"status": "ok", "message": "Service is running smoothly 🚀"}
+async def health_check():
+    return Response(content=HEALTH_PAYLOAD, media_type="application/json")
 
 @router.get("/me")
-async def my_profile():
-
-    current_time = datetime.now(timezone.utc).isoformat()
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get("https://catfact.ninja/fact")
-        data = response.json()
-        cat_fact = data.get("fact")
-
-    result = {
-        "status": "success",
-        "user": {
-            "email": "oloyedeibrahimsmile@gmail.com",
-            "name": "Ibrahim Oloyede",
-            "stack": "Django / FastAPI / PostgreSQL"
-        },
-        "timestamp": current_time,
-        "fact": cat_fact
-    }
-
-    return result
\ No newline at end of file
+async def my_profile(request: Request):
+
+    current_time = datetime.now(timezone.utc)
+
+    # served from the in-memory buffer filled in the background (see app.main lifespan)
+    cat_facts = await request.app.state.cat_facts_task
+    cat_fact = await cat_facts.get()
+
+    # only the timestamp and fact change per request; splice them around the
+    # pre-encoded user block instead of re-serializing the whole dict
+    body = b"".join((
+        b'{"status":"success","user":', PROFILE_USER_PAYLOAD,
+        b',"timestamp":', orjson.dumps(current_time.isoformat()),
+        b',"fact":', orjson.dumps(cat_fact),
+        b"}",
+    ))
+
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/me/cat-facts/stats")
+async def cat_fact_stats(request: Request):
+    cat_facts = await request.app.state.cat_facts_task
+    return {**cat_facts.stats, "single_flight": cat_facts.flight.stats}
+
+
+@router.get("/metrics")
+async def metrics(request: Request):
+    cat_facts = await request.app.state.cat_facts_task
+    counters = {f"cat_fact_{name}_total": value for name, value in cat_facts.stats.items()}
+    counters.update({f"cat_fact_single_flight_{name}_total": value
+                     for name, value in cat_facts.flight.stats.items()})
+    return Response(content=registry.render(counters), media_type="text/plain; version=0.0.4")
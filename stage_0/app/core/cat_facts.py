@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import deque
+
+import httpx
+
+from app.core.metrics import add_upstream_time
+from app.core.single_flight import SingleFlight
+
+
+class CatFactBuffer:
+    """
+    Keeps a small rotating buffer of cat facts in memory so /me never waits on
+    catfact.ninja in the common case.
+
+    A background task tops the buffer up over a shared, pooled httpx client.
+    When the buffer is empty we fetch inline under a hard timeout budget and,
+    if upstream is slow or down, fall back to the last fact we served.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, url: str, size: int = 16,
+                 timeout: float = 0.5, refill_interval: float = 1.0,
+                 coalesce_ttl: float = 1.0):
+        self.client = client
+        self.url = url
+        self.size = size
+        self.timeout = timeout
+        self.refill_interval = refill_interval
+
+        self._facts = deque(maxlen=size)
+        self._last_fact = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        # concurrent misses share one upstream GET instead of each firing their own
+        self.flight = SingleFlight(ttl=coalesce_ttl)
+
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "refills": 0, "errors": 0}
+
+    async def fetch(self):
+        response = await self.client.get(self.url)
+        response.raise_for_status()
+        return response.json().get("fact")
+
+    async def get(self):
+        # fast path: answer from memory
+        if self._facts:
+            self.stats["hits"] += 1
+            fact = self._facts.popleft()
+            self._last_fact = fact
+            if len(self._facts) < self.size // 2:
+                self._wakeup.set()
+            return fact
+
+        # buffer drained: try upstream once, inside our timeout budget
+        self.stats["misses"] += 1
+        self._wakeup.set()
+        fact = self.flight.get_cached(self.url)
+        if fact is not None:
+            self._last_fact = fact
+            return fact
+        start = time.perf_counter()
+        try:
+            fact = await asyncio.wait_for(self.flight.do(self.url, self.fetch), timeout=self.timeout)
+        except (asyncio.TimeoutError, httpx.HTTPError, ValueError):
+            add_upstream_time(time.perf_counter() - start)
+            self.stats["errors"] += 1
+            if self._last_fact is not None:
+                self.stats["stale"] += 1
+            return self._last_fact
+        # every request sharing the call waited on upstream, not just the one that made it
+        add_upstream_time(time.perf_counter() - start)
+        self._last_fact = fact
+        return fact
+
+    async def _refill_loop(self):
+        while True:
+            while len(self._facts) < self.size:
+                try:
+                    fact = await self.fetch()
+                except (httpx.HTTPError, ValueError):
+                    fact = None
+                # a 200 without a fact counts as a failure too, or this would
+                # spin on upstream until it sends one
+                if not fact:
+                    self.stats["errors"] += 1
+                    break
+                self._facts.append(fact)
+                self.stats["refills"] += 1
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,129 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Latency buckets in seconds, Prometheus-style upper bounds (+Inf is implicit).
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Upstream time spent on behalf of the current request, filled by the httpx hooks.
+_upstream_time = ContextVar("upstream_time", default=None)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Registry:
+    """Latency histograms keyed by (metric name, label tuple)."""
+
+    def __init__(self):
+        self.histograms = {}
+
+    def observe(self, name, labels, seconds):
+        key = (name, labels)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram()
+        hist.observe(seconds)
+
+    def render(self, extra_counters=None):
+        """Prometheus text exposition (format 0.0.4)."""
+        lines = []
+        seen = set()
+        for (name, labels), hist in sorted(self.histograms.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            prefix = label_str + "," if label_str else ""
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {hist.count}')
+            suffix = f"{{{label_str}}}" if label_str else ""
+            lines.append(f"{name}_sum{suffix} {hist.sum}")
+            lines.append(f"{name}_count{suffix} {hist.count}")
+        for name, value in (extra_counters or {}).items():
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware: records a latency histogram per route template and
+    adds a Server-Timing header splitting our time from upstream time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        upstream = [0.0]
+        token = _upstream_time.set(upstream)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - start
+                value = f"app;dur={(total - upstream[0]) * 1000:.3f}"
+                if upstream[0]:
+                    value += f", upstream;dur={upstream[0] * 1000:.3f}"
+                message["headers"] = [*message.get("headers", ()), (b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _upstream_time.reset(token)
+            route = scope.get("route")
+            # label by route template, not raw path, to keep cardinality bounded
+            path = route.path if route is not None else "unmatched"
+            registry.observe("http_request_duration_seconds",
+                             (("method", scope["method"]), ("route", path)),
+                             time.perf_counter() - start)
+
+
+async def on_upstream_request(request):
+    request.extensions["timing_start"] = time.perf_counter()
+
+
+async def on_upstream_response(response):
+    # fires once headers arrive, so this is time-to-first-byte from upstream
+    start = response.request.extensions.get("timing_start")
+    if start is None:
+        return
+    registry.observe("upstream_request_duration_seconds",
+                     (("host", response.request.url.host),), time.perf_counter() - start)
+
+
+def add_upstream_time(seconds):
+    # Credit `seconds` spent waiting on upstream to the current request's
+    # Server-Timing. Callers time their own wait rather than relying on the
+    # httpx hooks: a coalesced call runs in the first caller's context, so
+    # the hooks would credit only that request.
+    upstream = _upstream_time.get()
+    if upstream is not None:
+        upstream[0] += seconds
+
+
+# pass as httpx.AsyncClient(event_hooks=UPSTREAM_EVENT_HOOKS)
+UPSTREAM_EVENT_HOOKS = {"request": [on_upstream_request], "response": [on_upstream_response]}
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent async calls for the same key into one upstream call.
+
+    The first caller for a key starts the work in its own task; everyone else
+    asking for that key while it is in flight awaits the same task. Successful
+    results are kept for `ttl` seconds so a burst arriving just after the call
+    finishes is also served without going upstream. At most `max_entries`
+    results are cached; the oldest is evicted first.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self.stats = {"calls": 0, "shared": 0, "cached": 0, "evictions": 0}
+
+    def get_cached(self, key, default=None):
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self.stats["cached"] += 1
+                return value
+            del self._cache[key]
+        return default
+
+    async def do(self, key, fn):
+        value = self.get_cached(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["calls"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.stats["shared"] += 1
+
+        # shield so one caller timing out does not cancel the call for the rest
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.ttl > 0:
+            self._cache[key] = (time.monotonic() + self.ttl, task.result())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def forget(self, key=None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
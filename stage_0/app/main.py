@@ -1,17 +1,83 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+import orjson
+from fastapi import Depends, FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from app.api.routes import router
-from app.core.config import settings
+from app.core.config import Settings, current_settings, get_settings, settings_for
+from app.core.metrics import TimingMiddleware
+
+
+async def start_cat_facts(app: FastAPI):
+    # httpx is only needed by the cat-fact buffer, so it is imported here rather
+    # than when app.main is loaded
+    import httpx
+    from app.core.cat_facts import CatFactBuffer
+    from app.core.metrics import UPSTREAM_EVENT_HOOKS
+
+    settings = settings_for(app)
+    # one pooled client for the whole app lifetime, shared by every request
+    transport = getattr(app.state, "upstream_transport", None)
+    client = httpx.AsyncClient(transport=transport, timeout=settings.CAT_FACT_TIMEOUT * 4,
+                               event_hooks=UPSTREAM_EVENT_HOOKS)
+    cat_facts = CatFactBuffer(
+        client,
+        settings.CAT_FACT_URL,
+        size=settings.CAT_FACT_BUFFER_SIZE,
+        timeout=settings.CAT_FACT_TIMEOUT,
+        refill_interval=settings.CAT_FACT_REFILL_INTERVAL,
+        coalesce_ttl=settings.CAT_FACT_COALESCE_TTL,
+    )
+    cat_facts.start()
+    return cat_facts
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the buffer in the background so the worker starts accepting
+    # requests straight away; /me awaits this task on first use.
+    app.state.cat_facts_task = asyncio.create_task(start_cat_facts(app))
+    yield
+    task = app.state.cat_facts_task
+    if not task.done():
+        task.cancel()
+    try:
+        cat_facts = await task
+    except asyncio.CancelledError:
+        return
+    await cat_facts.stop()
+    await cat_facts.client.aclose()
+
+
+# The OpenAPI title and version and the route prefix are fixed when the app
+# is built, so only these are read at import. The cat-fact buffer and the
+# routes resolve settings per app run / per request through settings_for()
+# and current_settings, which honour app.dependency_overrides[get_settings].
+settings = get_settings()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+app.add_middleware(TimingMiddleware)
+
 # Register API routes
 app.include_router(router, prefix=settings.API_V1_STR)
 
+
+@lru_cache(maxsize=8)
+def root_payload(project_name: str) -> bytes:
+    # encoded once per project name rather than per request
+    return orjson.dumps({"message": f"Welcome to {project_name}"})
+
+
 @app.get("/")
-def root():
-    return {"message": f"Welcome to {settings.PROJECT_NAME}"}
+async def root(settings: Settings = Depends(current_settings)):
+    return Response(content=root_payload(settings.PROJECT_NAME), media_type="application/json")
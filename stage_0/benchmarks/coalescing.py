@@ -0,0 +1,45 @@
+"""
+Load test for upstream request coalescing on /me.
+
+Runs the app in-process over ASGI with the cat-fact buffer disabled, so every
+/me request takes the miss path, and counts how many GETs reach the (mocked)
+upstream as concurrency grows. With single-flight in place the count stays at
+one per burst.
+
+    cd stage_0
+    python -m benchmarks.coalescing
+"""
+import argparse
+import asyncio
+
+from app.core.config import Settings, get_settings
+from app.main import app
+from benchmarks.harness import MockUpstream, running_app
+
+
+async def run(concurrency, upstream_latency):
+    upstream = MockUpstream(latency=upstream_latency)
+    async with running_app(upstream) as client:
+        responses = await asyncio.gather(*(client.get("/me") for _ in range(concurrency)))
+
+    assert all(r.status_code == 200 for r in responses)
+    return upstream.calls
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", default="1,10,50,100,250,500")
+    parser.add_argument("--upstream-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # every request misses the buffer and goes through single-flight
+    app.dependency_overrides[get_settings] = lambda: Settings(CAT_FACT_BUFFER_SIZE=0)
+
+    print(f"{'concurrency':>12} {'upstream calls':>15}")
+    for level in (int(x) for x in args.levels.split(",")):
+        calls = await run(level, args.upstream_latency)
+        print(f"{level:>12} {calls:>15}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""
+Shared plumbing for the stage_0 benchmarks: run app.main:app in-process with
+its lifespan, talk to it over ASGI, and stand in for catfact.ninja with an
+httpx.MockTransport so no real network is involved.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.main import app
+
+FACT = "Cats sleep 70% of their lives."
+
+
+class MockUpstream:
+    """Fake catfact.ninja that counts calls and optionally adds latency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    async def handle(self, request):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(200, json={"fact": FACT})
+
+
+@asynccontextmanager
+async def running_app(upstream: MockUpstream, target=app):
+    target.state.upstream_transport = upstream.transport
+    async with target.router.lifespan_context(target):
+        async with in_process_client(target) as client:
+            yield client
+
+
+def in_process_client(target):
+    transport = httpx.ASGITransport(app=target)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench")
@@ -0,0 +1,147 @@
+"""
+In-process ASGI load benchmark for the stage_0 service.
+
+Drives app.main:app over ASGI (no sockets) with a mocked cat-fact upstream
+and reports p50/p95/p99 latency, requests/sec and bytes allocated per
+request for each path. Results can be written as JSON and compared against
+a previous run so CI can flag regressions between commits.
+
+    cd stage_0
+    python -m benchmarks.load -n 5000 -c 100 --output bench.json
+    python -m benchmarks.load --compare bench.json --max-regression 10
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.harness import MockUpstream, running_app
+
+DEFAULT_PATHS = ("/health", "/me", "/")
+
+
+def percentile(sorted_values, pct):
+    # nearest-rank percentile; sorted_values must be non-empty
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure_latency(client, path, total, concurrency):
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "req_per_sec": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def measure_allocations(client, path, samples):
+    # Sequential requests under tracemalloc; the peak over each request is
+    # what it allocated on top of what was already live.
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await client.get(path)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return {"alloc_bytes_per_request": total // samples}
+
+
+async def run(paths, total, concurrency, alloc_samples, upstream_latency):
+    results = {}
+    async with running_app(MockUpstream(latency=upstream_latency)) as client:
+        for path in paths:
+            # warm up so routing and the fact buffer are primed
+            for _ in range(10):
+                await client.get(path)
+            stats = await measure_latency(client, path, total, concurrency)
+            stats.update(await measure_allocations(client, path, alloc_samples))
+            results[path] = stats
+    return results
+
+
+def compare(baseline, current, max_regression):
+    """Print per-path deltas; return False if any path regressed past the limit."""
+    ok = True
+    print(f"{'path':<10} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>9}")
+    for path, stats in current["results"].items():
+        old = baseline["results"].get(path)
+        if old is None:
+            continue
+        for metric, higher_is_better in (("req_per_sec", True), ("p99_ms", False)):
+            change = (stats[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            regressed = -change if higher_is_better else change
+            flag = " !" if regressed > max_regression else ""
+            ok = ok and not flag
+            print(f"{path:<10} {metric:<12} {old[metric]:>12} {stats[metric]:>12} {change:>+8.1f}%{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="requests per path")
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("--paths", default=",".join(DEFAULT_PATHS))
+    parser.add_argument("--alloc-samples", type=int, default=200)
+    parser.add_argument("--upstream-latency", type=float, default=0.0,
+                        help="seconds the mocked cat-fact API takes to answer")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON from a previous run to diff against")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="percent drop in req/s or rise in p99 that fails --compare")
+    args = parser.parse_args()
+
+    paths = [p for p in args.paths.split(",") if p]
+    results = asyncio.run(run(paths, args.requests, args.concurrency,
+                              args.alloc_samples, args.upstream_latency))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    print(f"{'path':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'alloc B/req':>12}")
+    for path, s in results.items():
+        print(f"{path:<10} {s['req_per_sec']:>9} {s['p50_ms']:>9} {s['p95_ms']:>9} "
+              f"{s['p99_ms']:>9} {s['alloc_bytes_per_request']:>12}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        print()
+        if not compare(baseline, report, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
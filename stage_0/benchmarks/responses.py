@@ -0,0 +1,81 @@
+"""
+Requests/sec for the JSON response path, before and after pre-encoding.
+
+"before" is a copy of the original handlers (dicts rendered by FastAPI's
+default JSONResponse); "after" is app.main:app as shipped, with
+ORJSONResponse as the default class and constant payloads served as bytes.
+Both are driven in-process over ASGI with a mocked cat-fact upstream.
+
+    cd stage_0
+    python -m benchmarks.responses
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+
+from app.main import app
+from benchmarks.harness import FACT, MockUpstream, in_process_client, running_app
+
+
+def build_baseline_app():
+    baseline = FastAPI()
+
+    @baseline.get("/health")
+    def health_check():
+        return {"status": "ok", "message": "Service is running smoothly 🚀"}
+
+    @baseline.get("/me")
+    async def my_profile():
+        return {
+            "status": "success",
+            "user": {
+                "email": "oloyedeibrahimsmile@gmail.com",
+                "name": "Ibrahim Oloyede",
+                "stack": "Django / FastAPI / PostgreSQL"
+            },
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "fact": FACT
+        }
+
+    @baseline.get("/")
+    def root():
+        return {"message": "Welcome to Profile"}
+
+    return baseline
+
+
+async def requests_per_second(target, path, total, concurrency):
+    async with in_process_client(target) as client:
+        await client.get(path)  # warm up routing / dependency caches
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                await client.get(path)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--requests", type=int, default=3000)
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    baseline = build_baseline_app()
+
+    print(f"{'path':<10} {'before req/s':>14} {'after req/s':>14} {'speedup':>9}")
+    async with running_app(MockUpstream()):
+        for path in ("/health", "/me", "/"):
+            before = await requests_per_second(baseline, path, args.requests, args.concurrency)
+            after = await requests_per_second(app, path, args.requests, args.concurrency)
+            print(f"{path:<10} {before:>14.0f} {after:>14.0f} {after / before:>8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
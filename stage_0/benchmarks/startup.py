@@ -0,0 +1,62 @@
+"""
+Cold-start cost of importing app.main, measured with `python -X importtime`.
+
+Each run is a fresh interpreter, so nothing is cached in sys.modules. Prints
+the median cumulative import time of app.main across runs and the slowest
+modules it pulls in.
+
+    cd stage_0
+    python -m benchmarks.startup --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+STAGE_DIR = Path(__file__).resolve().parent.parent
+
+
+def import_times(module):
+    """Return {module: cumulative microseconds} for one fresh `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=STAGE_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self [us] | cumulative | imported package"
+        _self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    total = statistics.median(r[args.module] for r in runs)
+    print(f"{args.module}: {total / 1000:.1f} ms median cumulative import over {args.runs} runs\n")
+
+    # slowest top-level packages by cumulative time (median across runs)
+    packages = {name for r in runs for name in r if "." not in name and name != args.module}
+    slowest = sorted(
+        ((statistics.median(r.get(name, 0) for r in runs), name) for name in packages),
+        reverse=True,
+    )[:args.top]
+    print(f"{'package':<30} {'ms':>8}")
+    for us, name in slowest:
+        print(f"{name:<30} {us / 1000:>8.1f}")
+    print(f"\nhttpx imported at startup: {any('httpx' in r for r in runs)}")
+
+
+if __name__ == "__main__":
+    main()
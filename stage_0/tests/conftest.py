@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+import pytest
+
+FACT = "Cats sleep 70% of their lives."
+
+
+@pytest.fixture
+def anyio_backend():
+    # the app and SingleFlight are asyncio-only
+    return "asyncio"
+
+
+class Upstream:
+    """httpx.MockTransport standing in for catfact.ninja; counts the GETs it answers."""
+
+    def __init__(self, latency=0.0, body=None):
+        self.latency = latency
+        self.body = {"fact": FACT} if body is None else body
+        self.calls = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    async def handle(self, request):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(200, json=self.body)
+
+
+@pytest.fixture
+def upstream():
+    return Upstream()
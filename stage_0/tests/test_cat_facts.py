@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.cat_facts import CatFactBuffer
+from tests.conftest import FACT, Upstream
+
+pytestmark = pytest.mark.anyio
+
+URL = "https://catfact.test/fact"
+
+
+def make_buffer(upstream, **kwargs):
+    client = httpx.AsyncClient(transport=upstream.transport)
+    return CatFactBuffer(client, URL, **kwargs)
+
+
+async def wait_for(condition, timeout=1.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_hit_is_served_from_the_buffer(upstream):
+    buffer = make_buffer(upstream, size=4)
+    buffer.start()
+    try:
+        await wait_for(lambda: buffer.stats["refills"] == 4)
+        calls = upstream.calls
+        assert await buffer.get() == FACT
+    finally:
+        await buffer.stop()
+    assert upstream.calls == calls
+    assert (buffer.stats["hits"], buffer.stats["misses"]) == (1, 0)
+
+
+async def test_miss_fetches_inline(upstream):
+    buffer = make_buffer(upstream, size=0)
+    assert await buffer.get() == FACT
+    assert upstream.calls == 1
+    assert buffer.stats == {"hits": 0, "misses": 1, "stale": 0, "refills": 0, "errors": 0}
+
+
+async def test_timeout_falls_back_to_the_last_fact():
+    upstream = Upstream()
+    buffer = make_buffer(upstream, size=0, timeout=0.05, coalesce_ttl=0)
+    assert await buffer.get() == FACT
+
+    upstream.latency = 1
+    assert await buffer.get() == FACT
+    assert (buffer.stats["misses"], buffer.stats["errors"], buffer.stats["stale"]) == (2, 1, 1)
+
+
+async def test_timeout_without_a_previous_fact_returns_none():
+    buffer = make_buffer(Upstream(latency=1), size=0, timeout=0.05)
+    assert await buffer.get() is None
+    assert (buffer.stats["errors"], buffer.stats["stale"]) == (1, 0)
+
+
+async def test_refill_waits_after_a_response_without_a_fact():
+    upstream = Upstream(body={})
+    buffer = make_buffer(upstream, size=4, refill_interval=10)
+    buffer.start()
+    try:
+        await wait_for(lambda: buffer.stats["errors"] == 1)
+        await asyncio.sleep(0.05)
+    finally:
+        await buffer.stop()
+    # one attempt, then the loop sleeps for refill_interval instead of retrying
+    assert upstream.calls == 1
+    assert buffer.stats["refills"] == 0
@@ -0,0 +1,31 @@
+import pytest
+
+from app.core.config import Settings, get_settings
+from app.main import app
+from benchmarks.harness import running_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def overridden_settings():
+    settings = Settings(PROJECT_NAME="Test Profile", CAT_FACT_BUFFER_SIZE=0)
+    app.dependency_overrides[get_settings] = lambda: settings
+    yield settings
+    app.dependency_overrides.clear()
+
+
+async def test_settings_override_reaches_root_and_buffer(upstream, overridden_settings):
+    async with running_app(upstream) as client:
+        assert (await client.get("/")).json() == {"message": "Welcome to Test Profile"}
+        assert (await client.get("/me")).json()["fact"] is not None
+        stats = (await client.get("/me/cat-facts/stats")).json()
+    # an empty buffer: /me went upstream inline
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+    assert upstream.calls == 1
+
+
+async def test_root_without_override(upstream):
+    async with running_app(upstream) as client:
+        body = (await client.get("/")).json()
+    assert body == {"message": f"Welcome to {get_settings().PROJECT_NAME}"}
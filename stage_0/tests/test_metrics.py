@@ -0,0 +1,100 @@
+import asyncio
+import re
+
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import Settings, get_settings
+from app.core.metrics import Registry, TimingMiddleware, registry
+from app.main import app
+from benchmarks.harness import in_process_client, running_app
+from tests.conftest import Upstream
+
+pytestmark = pytest.mark.anyio
+
+TIMING = re.compile(r"app;dur=(?P<app>[\d.]+)(?:, upstream;dur=(?P<upstream>[\d.]+))?$")
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.histograms.clear()
+    yield
+    registry.histograms.clear()
+
+
+def server_timing(response):
+    return TIMING.match(response.headers["server-timing"]).groupdict()
+
+
+async def test_histograms_are_labelled_by_route_template():
+    items = FastAPI()
+    items.add_middleware(TimingMiddleware)
+
+    @items.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    async with in_process_client(items) as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+        assert (await client.get("/nope")).status_code == 404
+
+    counts = {labels: hist.count for (name, labels), hist in registry.histograms.items()
+              if name == "http_request_duration_seconds"}
+    assert counts == {
+        (("method", "GET"), ("route", "/items/{item_id}")): 2,
+        (("method", "GET"), ("route", "unmatched")): 1,
+    }
+
+
+async def test_server_timing_without_upstream(upstream):
+    async with running_app(upstream) as client:
+        timing = server_timing(await client.get("/health"))
+    assert float(timing["app"]) >= 0
+    assert timing["upstream"] is None
+
+
+@pytest.fixture
+def empty_buffer():
+    app.dependency_overrides[get_settings] = lambda: Settings(CAT_FACT_BUFFER_SIZE=0, CAT_FACT_TIMEOUT=1)
+    yield
+    app.dependency_overrides.clear()
+
+
+async def test_coalesced_requests_all_report_upstream_time(empty_buffer):
+    upstream = Upstream(latency=0.05)
+    async with running_app(upstream) as client:
+        responses = await asyncio.gather(*(client.get("/me") for _ in range(3)))
+    assert upstream.calls == 1
+    for response in responses:
+        timing = server_timing(response)
+        # the wait on the shared call is upstream time, not ours
+        assert float(timing["upstream"]) >= 50
+        assert float(timing["app"]) < float(timing["upstream"])
+
+
+def test_render_format():
+    metrics = Registry()
+    metrics.observe("req_seconds", (("route", "/"),), 0.003)
+    metrics.observe("req_seconds", (("route", "/"),), 10)
+    lines = metrics.render({"hits_total": 2}).splitlines()
+    assert lines[0] == "# TYPE req_seconds histogram"
+    assert 'req_seconds_bucket{route="/",le="0.0025"} 0' in lines
+    assert 'req_seconds_bucket{route="/",le="0.005"} 1' in lines
+    assert 'req_seconds_bucket{route="/",le="5.0"} 1' in lines
+    assert 'req_seconds_bucket{route="/",le="+Inf"} 2' in lines
+    assert 'req_seconds_sum{route="/"} 10.003' in lines
+    assert 'req_seconds_count{route="/"} 2' in lines
+    assert lines[-2:] == ["# TYPE hits_total counter", "hits_total 2"]
+
+
+async def test_metrics_endpoint(upstream):
+    async with running_app(upstream) as client:
+        await client.get("/health")
+        response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert "# TYPE http_request_duration_seconds histogram\n" in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health"} 1\n' in text
+    assert "# TYPE cat_fact_hits_total counter\n" in text
+    assert "# TYPE cat_fact_single_flight_calls_total counter\n" in text
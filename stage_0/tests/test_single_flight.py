@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.cat_facts import CatFactBuffer
+from app.core.single_flight import SingleFlight
+from tests.conftest import FACT, Upstream
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("concurrency", [1, 10, 100, 500])
+async def test_one_upstream_call_per_burst(concurrency):
+    upstream = Upstream(latency=0.05)
+    client = httpx.AsyncClient(transport=upstream.transport)
+    # an empty buffer sends every request down the miss path
+    buffer = CatFactBuffer(client, "https://catfact.test/fact", size=0, timeout=1)
+    facts = await asyncio.gather(*(buffer.get() for _ in range(concurrency)))
+    assert facts == [FACT] * concurrency
+    assert upstream.calls == 1
+    assert buffer.flight.stats["calls"] == 1
+
+
+async def test_result_is_reused_until_the_ttl_passes():
+    flight = SingleFlight(ttl=0.05)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert await flight.do("fact", fetch) == 1
+    assert await flight.do("fact", fetch) == 1
+    assert flight.get_cached("fact") == 1
+    await asyncio.sleep(0.1)
+    assert flight.get_cached("fact") is None
+    assert await flight.do("fact", fetch) == 2
+    assert flight.stats["calls"] == 2
+
+
+async def test_zero_ttl_only_shares_in_flight_calls():
+    flight = SingleFlight(ttl=0)
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return FACT
+
+    await asyncio.gather(flight.do("fact", fetch), flight.do("fact", fetch))
+    assert (flight.stats["calls"], flight.stats["shared"]) == (1, 1)
+    await flight.do("fact", fetch)
+    assert flight.stats["calls"] == 2
+
+
+async def test_failures_are_not_cached():
+    flight = SingleFlight(ttl=10)
+
+    async def fail():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        await flight.do("fact", fail)
+    assert flight.get_cached("fact") is None
+
+
+async def test_oldest_result_is_evicted():
+    flight = SingleFlight(ttl=10, max_entries=2)
+
+    async def fetch():
+        return FACT
+
+    for key in ("a", "b", "c"):
+        await flight.do(key, fetch)
+    assert flight.get_cached("a") is None
+    assert flight.get_cached("b") == flight.get_cached("c") == FACT
+    assert flight.stats["evictions"] == 1
+
+
+async def test_a_caller_timing_out_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return FACT
+
+    impatient = asyncio.wait_for(flight.do("fact", fetch), timeout=0.01)
+    results = await asyncio.gather(impatient, flight.do("fact", fetch), return_exceptions=True)
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert results[1] == FACT
+    assert flight.stats["calls"] == 1
@@ -0,0 +1,141 @@
+import hashlib
+import string
+from collections import Counter
+
+# Every ASCII byte that is not [0-9a-zA-Z]; deleted before the palindrome check.
+_NON_ALNUM = bytes(b for b in range(128) if chr(b) not in string.ascii_letters + string.digits)
+# The same plus every byte >= 0x80, for UTF-8 bytes: each byte of a multi-byte
+# character is >= 0x80, so deleting those drops exactly the non-ASCII characters.
+_NON_ALNUM_UTF8 = _NON_ALNUM + bytes(range(128, 256))
+
+
+def sha256_hex(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def palindrome_key(value: str) -> bytes:
+    """
+    Case-insensitive, alphanumeric-only form of `value` used for the palindrome
+    check. Same result as re.sub(r'[^0-9a-zA-Z]', '', value).lower(), but done
+    with C-level encode/translate instead of a regex.
+    """
+    # dropping non-ASCII first leaves only bytes translate() can filter
+    return value.encode('ascii', 'ignore').translate(None, _NON_ALNUM).lower()
+
+
+def analyze(value: str, sha256: str = None) -> dict:
+    """
+    Compute every stored property of `value` in one pass over the string.
+
+    Pass `sha256` when the caller has already hashed the value (e.g. for the
+    duplicate check) so it is not hashed twice.
+    """
+    freq = Counter(value)
+    key = palindrome_key(value)
+    sha = sha256 or sha256_hex(value)
+    return {
+        "id": sha,
+        "sha256_hash": sha,
+        "length": len(value),
+        "is_palindrome": key == key[::-1],
+        "unique_characters": len(freq),
+        "word_count": len(value.split()),
+        "character_frequency_map": dict(freq),
+    }
+
+
+def is_palindrome_file(f, size: int, chunk_size: int = 1 << 16) -> bool:
+    """
+    is_palindrome of the UTF-8 text in the first `size` bytes of the seekable
+    binary file `f`, read `chunk_size` bytes at a time from both ends, so
+    memory stays bounded by the chunk size whatever the file's length.
+    """
+    lo, hi = 0, size  # the bytes not read yet
+    front = back = b''  # palindrome keys of bytes read from each end, not compared yet
+    while lo < hi:
+        if not front:
+            f.seek(lo)
+            data = f.read(min(chunk_size, hi - lo))
+            lo += len(data)
+            front = data.translate(None, _NON_ALNUM_UTF8).lower()
+        elif not back:
+            n = min(chunk_size, hi - lo)
+            hi -= n
+            f.seek(hi)
+            back = f.read(n).translate(None, _NON_ALNUM_UTF8).lower()
+        else:
+            n = min(len(front), len(back))
+            if front[:n] != back[len(back) - n:][::-1]:
+                return False
+            front, back = front[n:], back[:len(back) - n]
+    # what is left (one side at most has bytes) is the middle of the key
+    rest = front + back
+    return rest == rest[::-1]
+
+
+class StreamingAnalysis:
+    """
+    Incremental analyze(): feed the value in chunks with update(), then call
+    result(). Memory is bounded by the chunk plus the distinct characters,
+    and the palindrome key (the value's ASCII letters and digits), which is
+    kept for an exact check. With palindrome=False the key is not kept and
+    the caller passes is_palindrome to result() instead (uploads check their
+    spooled bytes with is_palindrome_file()).
+
+    A word split across two chunks is counted once. Pass `sha256` when the
+    hash is already known, and `encoded` to update() when the raw UTF-8 bytes
+    are at hand (uploads): they are hashed as given, so a character split
+    across two byte chunks may be decoded in one update and hashed in another.
+    """
+
+    def __init__(self, palindrome=True, sha256=None):
+        self.freq = Counter()
+        self.sha256 = sha256
+        self.digest = None if sha256 else hashlib.sha256()
+        self.length = 0
+        self.words = 0
+        self._in_word = False  # previous chunk ended inside a word
+        self._keys = [] if palindrome else None
+
+    def update(self, chunk: str, encoded: bytes = None):
+        if self.digest is not None:
+            self.digest.update(chunk.encode('utf-8') if encoded is None else encoded)
+        if not chunk:
+            return
+        self.freq += Counter(chunk)
+        self.length += len(chunk)
+        self.words += len(chunk.split())
+        if self._in_word and not chunk[0].isspace():
+            self.words -= 1
+        self._in_word = not chunk[-1].isspace()
+        if self._keys is not None:
+            self._keys.append(palindrome_key(chunk))
+
+    def is_palindrome(self):
+        key = b''.join(self._keys)
+        return key == key[::-1]
+
+    def result(self, is_palindrome: bool = None) -> dict:
+        sha = self.sha256 or self.digest.hexdigest()
+        return {
+            "id": sha,
+            "sha256_hash": sha,
+            "length": self.length,
+            "is_palindrome": self.is_palindrome() if is_palindrome is None else is_palindrome,
+            "unique_characters": len(self.freq),
+            "word_count": self.words,
+            "character_frequency_map": dict(self.freq),
+        }
+
+
+def analyze_chunked(value: str, sha256: str = None, chunk_size: int = 1 << 20) -> dict:
+    """
+    Same result as analyze(), computed `chunk_size` characters at a time
+    through StreamingAnalysis: per-chunk Counters are merged by addition and
+    sha256 is fed chunk by chunk. Used for very large strings in the
+    analysis process pool (see offload.py).
+    """
+    analysis = StreamingAnalysis(sha256=sha256)
+    for start in range(0, len(value), chunk_size):
+        analysis.update(value[start:start + chunk_size])
+    return analysis.result()
@@ -0,0 +1,24 @@
+"""
+The analyzer routes with the async views of async_views.py in place of the
+DRF ones. analyzer/urls.py switches to these when ANALYZER_ASYNC_VIEWS is on.
+"""
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from .async_views import (
+    AsyncCreateListStringsView, AsyncNaturalLanguageFilterView,
+    AsyncRetrieveDeleteStringView, AsyncRetrieveStringByHashView,
+)
+from .views import BulkCreateStringsView, MetricsView, StatsView, UploadStringView
+
+urlpatterns = [
+    # plain Django views get CSRF checks that DRF's APIView exempts; keep the API exempt
+    path('strings', csrf_exempt(AsyncCreateListStringsView.as_view()), name='list_strings'),
+    # fixed paths must come before the <path:string_value> catch-all below
+    path('strings/bulk', BulkCreateStringsView.as_view(), name='bulk_create_strings'),
+    path('strings/upload', UploadStringView.as_view(), name='upload_string'),
+    path('strings/filter-by-natural-language', AsyncNaturalLanguageFilterView.as_view(), name='nl_filter'),
+    path('strings/metrics', MetricsView.as_view(), name='string_metrics'),
+    path('strings/stats', StatsView.as_view(), name='string_stats'),
+    path('strings/by-hash/<str:sha>', AsyncRetrieveStringByHashView.as_view(), name='get_string_by_hash'),
+    path('strings/<path:string_value>', csrf_exempt(AsyncRetrieveDeleteStringView.as_view()), name='get_string'),
+]
@@ -0,0 +1,199 @@
+"""
+Native async versions of the string endpoints for ASGI deployments.
+
+DRF views are synchronous, so under ASGI every request to them is handed to
+a thread through sync_to_async. These plain Django views are coroutines that
+use the async ORM (aexists, acreate, adelete, async iteration) and the cache
+backend's async API instead. They serve the same URLs with the same JSON
+bodies and status codes, and are routed in place of the DRF views when
+settings.ANALYZER_ASYNC_VIEWS is on (see urls.py).
+
+Bulk create and metrics are not duplicated here; they stay DRF views.
+"""
+import json
+
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+
+from .analysis import sha256_hex
+from .cache import query_cache, representation_cache
+from .filters import (
+    aiter_formatted, check_conflicts, compile_filters, format_rows, parse_fields, parse_limit,
+    parse_list_filters, project,
+)
+from .models import AnalyzedString
+from .pagination import InvalidCursor, apaginate, apply_keyset
+from .renderers import NDJSONRenderer, stream_ndjson
+from .utils import NLParseError, parse_nl_query
+
+
+def _detail(message, status):
+    return JsonResponse({"detail": message}, status=status)
+
+
+def _wants_ndjson(request):
+    return (request.GET.get('format') == NDJSONRenderer.format
+            or NDJSONRenderer.media_type in request.headers.get('Accept', ''))
+
+
+async def aget_representation(sha):
+    """Async get_representation: the LRU first, then the primary key."""
+    representation = representation_cache.get(sha)
+    if representation is None:
+        # taken before the read: a delete committing meanwhile voids the set() below
+        epoch = representation_cache.epoch()
+        obj = await AnalyzedString.objects.filter(id=sha).afirst()
+        if obj is None:
+            return None
+        representation = obj.to_representation()
+        representation_cache.set(sha, representation, epoch)
+    return representation
+
+
+class AsyncCreateListStringsView(View):
+    """
+    POST /strings
+    GET /strings?is_palindrome=&min_length=&max_length=&word_count=&contains_character=
+                &limit=&cursor=&format=ndjson&fields=value,length,...
+    """
+    max_page_size = 1000
+    chunk_size = 500  # rows fetched per round-trip when iterating a full listing
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return _detail("JSON parse error", 400)
+        if not isinstance(data, dict) or 'value' not in data:
+            return _detail('Missing "value" field', 400)
+        if not isinstance(data['value'], str):
+            return _detail('"value" must be a string', 422)
+        value = data['value']
+        sha = sha256_hex(value)
+        if await AnalyzedString.objects.filter(id=sha).aexists():
+            return _detail("String already exists", 409)
+        try:
+            # save() reuses the hash instead of computing it again
+            instance = await AnalyzedString.objects.acreate(value=value, sha256_hash=sha)
+        except IntegrityError:
+            return _detail("String already exists", 409)
+        return JsonResponse(instance.to_representation(), status=201)
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            filters_applied = parse_list_filters(request.GET)
+            fields = parse_fields(request.GET.get('fields'))
+            limit = parse_limit(request.GET.get('limit'), self.max_page_size)
+        except ValueError as e:
+            return _detail(str(e), 400)
+        qs = project(compile_filters(filters_applied), fields)
+        cursor = request.GET.get('cursor')
+        streaming = _wants_ndjson(request)
+
+        if not streaming:
+            cache_params = {"filters": filters_applied, "limit": limit, "cursor": cursor, "fields": fields}
+            cached, generation = await query_cache.aget('list', cache_params)
+            if cached is not None:
+                return self._list_response(cached, filters_applied, limit, 'HIT')
+
+        next_cursor = None
+        try:
+            if limit is not None:
+                rows, next_cursor = await apaginate(qs, limit, cursor)
+            else:
+                rows = apply_keyset(qs, cursor)
+        except InvalidCursor as e:
+            return _detail(str(e), 400)
+
+        if streaming:
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+            if limit is not None:
+                return stream_ndjson(format_rows(rows, fields), headers=headers)
+            return stream_ndjson(aiter_formatted(rows, fields, self.chunk_size), headers=headers)
+
+        if limit is None:
+            rows = [row async for row in rows]
+        result = {"data": format_rows(rows, fields), "next_cursor": next_cursor}
+        await query_cache.aset('list', cache_params, generation, result, rows=len(result["data"]))
+        return self._list_response(result, filters_applied, limit, 'MISS')
+
+    @staticmethod
+    def _list_response(result, filters_applied, limit, cache_status):
+        body = {
+            "data": result["data"],
+            "count": len(result["data"]),
+            "filters_applied": filters_applied
+        }
+        if limit is not None:
+            body["next_cursor"] = result["next_cursor"]
+        return JsonResponse(body, headers={"X-Cache": cache_status})
+
+
+class AsyncRetrieveDeleteStringView(View):
+    """
+    GET /strings/{string_value}
+    DELETE /strings/{string_value}
+    """
+    async def get(self, request, string_value, *args, **kwargs):
+        representation = await aget_representation(sha256_hex(string_value))
+        if representation is None:
+            return _detail("Not found", 404)
+        return JsonResponse(representation)
+
+    async def delete(self, request, string_value, *args, **kwargs):
+        # post_delete drops the cached representation
+        deleted, _ = await AnalyzedString.objects.filter(id=sha256_hex(string_value)).adelete()
+        if not deleted:
+            return _detail("Not found", 404)
+        return HttpResponse(status=204)
+
+
+class AsyncRetrieveStringByHashView(View):
+    """
+    GET /strings/by-hash/{sha256}
+    """
+    async def get(self, request, sha, *args, **kwargs):
+        representation = await aget_representation(sha.lower())
+        if representation is None:
+            return _detail("Not found", 404)
+        return JsonResponse(representation)
+
+
+class AsyncNaturalLanguageFilterView(View):
+    """
+    GET /strings/filter-by-natural-language?query=...&fields=...
+    """
+    async def get(self, request, *args, **kwargs):
+        q = request.GET.get('query')
+        if not q:
+            return _detail("query parameter is required", 400)
+        try:
+            parsed = parse_nl_query(q)
+        except NLParseError as e:
+            return _detail(str(e), 400)
+        parsed_filters = parsed['parsed_filters']
+
+        try:
+            fields = parse_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return _detail(str(e), 400)
+        try:
+            check_conflicts(parsed_filters)
+        except ValueError as e:
+            return _detail(str(e), 422)
+
+        cache_params = {"filters": parsed_filters, "fields": fields}
+        cached, generation = await query_cache.aget('nl', cache_params)
+        if cached is not None:
+            data, cache_status = cached, "HIT"
+        else:
+            qs = project(compile_filters(parsed_filters), fields)
+            data = format_rows([row async for row in qs], fields)
+            await query_cache.aset('nl', cache_params, generation, data, rows=len(data))
+            cache_status = "MISS"
+        return JsonResponse({
+            "data": data,
+            "count": len(data),
+            "interpreted_query": parsed
+        }, headers={"X-Cache": cache_status})
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU used for per-process caches of hot rows. Entries
+    expire `ttl` seconds after they are set (never with ttl=None).
+
+    epoch() counts invalidations (discard/clear). A reader that takes it
+    before loading a value and passes it to set() has the value dropped if
+    an invalidation happened in between, so a load that raced a delete
+    cannot put the deleted row back.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def epoch(self):
+        return self._epoch
+
+    def set(self, key, value, epoch=None):
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            expires = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._epoch += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Recently read AnalyzedString representations keyed by sha256. Entries are
+# dropped once a save/delete commits (model signals, via on_commit). The
+# cache is per process: another worker keeps serving its own copy of a
+# changed or deleted string until the entry's TTL runs out.
+representation_cache = LRUCache(getattr(settings, 'ANALYZER_REPRESENTATION_CACHE_SIZE', 1024),
+                                ttl=getattr(settings, 'ANALYZER_REPRESENTATION_CACHE_TTL', 30))
+
+
+class QueryCache:
+    """
+    Caches list / natural-language query results in Django's cache framework,
+    keyed on the normalized filter dict the views build.
+
+    Every key embeds a generation number that is bumped whenever a string is
+    created or deleted, so stale results are never read, just left to expire.
+    Results with more than `max_rows` rows are not cached.
+
+    The generation lives in the same cache as the results, so invalidation
+    reaches exactly the processes that share that cache. Under locmem (the
+    default) it is per process: other workers serve their cached results
+    until they expire, `timeout` seconds at most.
+    """
+    generation_key = 'analyzer:generation'
+
+    def __init__(self, alias='default', timeout=60, max_rows=1000):
+        self.alias = alias
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def generation(self):
+        return self.cache.get_or_set(self.generation_key, 0, timeout=None)
+
+    def bump(self):
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            # key evicted or never set; anything not previously used will do
+            self.cache.add(self.generation_key, 1, timeout=None)
+
+    def _key(self, kind, params, generation):
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return f'analyzer:q:{generation}:{kind}:{digest}'
+
+    def get(self, kind, params):
+        """Return (value, generation); value is None on a miss."""
+        generation = self.generation()
+        value = self.cache.get(self._key(kind, params, generation))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value, generation
+
+    def set(self, kind, params, generation, value, rows):
+        # stored under the generation read *before* querying, so a write that
+        # lands in between leaves this entry unreachable rather than stale
+        if rows <= self.max_rows:
+            self.cache.set(self._key(kind, params, generation), value, self.timeout)
+
+    # async counterparts for the async views, through the cache backend's a* API
+
+    async def ageneration(self):
+        return await self.cache.aget_or_set(self.generation_key, 0, timeout=None)
+
+    async def aget(self, kind, params):
+        generation = await self.ageneration()
+        value = await self.cache.aget(self._key(kind, params, generation))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value, generation
+
+    async def aset(self, kind, params, generation, value, rows):
+        if rows <= self.max_rows:
+            await self.cache.aset(self._key(kind, params, generation), value, self.timeout)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.CACHES[self.alias]['BACKEND'],
+            "generation": self.generation(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+query_cache = QueryCache(
+    alias=getattr(settings, 'ANALYZER_QUERY_CACHE_ALIAS', 'default'),
+    timeout=getattr(settings, 'ANALYZER_QUERY_CACHE_TIMEOUT', 60),
+    max_rows=getattr(settings, 'ANALYZER_QUERY_CACHE_MAX_ROWS', 1000),
+)
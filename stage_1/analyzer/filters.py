@@ -0,0 +1,188 @@
+import json
+
+from django.core.files.storage import default_storage
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+from .frequency import unpack_frequency_map
+from .models import AnalyzedString
+
+# Fields a client can ask for with ?fields=; "id" is always returned.
+PROPERTY_FIELDS = ('length', 'is_palindrome', 'unique_characters', 'word_count',
+                   'sha256_hash', 'character_frequency_map')
+REPRESENTATION_FIELDS = ('value', *PROPERTY_FIELDS, 'created_at')
+
+
+def parse_fields(raw):
+    """
+    Turn a `fields=` query value into a tuple of representation fields.
+    None/empty means every field. Raises ValueError on unknown names.
+    """
+    if not raw:
+        return REPRESENTATION_FIELDS
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = requested - set(REPRESENTATION_FIELDS) - {'id'}
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in REPRESENTATION_FIELDS if name in requested)
+
+
+def parse_list_filters(params):
+    """
+    Validate the GET /strings filter parameters into the dict reported back
+    as filters_applied. Raises ValueError with the message for a 400.
+    """
+    filters = {}
+    is_pal = params.get('is_palindrome')
+    if is_pal is not None:
+        if is_pal.lower() not in ('true', 'false'):
+            raise ValueError("is_palindrome must be true or false")
+        filters['is_palindrome'] = is_pal.lower() == 'true'
+
+    for name in ('min_length', 'max_length', 'word_count'):
+        raw = params.get(name)
+        if raw is not None:
+            try:
+                filters[name] = int(raw)
+            except ValueError:
+                raise ValueError(f"{name} must be integer")
+
+    contains_character = params.get('contains_character')
+    if contains_character is not None:
+        if len(contains_character) != 1:
+            raise ValueError("contains_character must be a single character")
+        filters['contains_character'] = contains_character
+    return filters
+
+
+def parse_limit(raw, max_page_size):
+    """?limit= as an int in [1, max_page_size], or None. Raises ValueError."""
+    if raw is None:
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("limit must be integer")
+    if not 1 <= limit <= max_page_size:
+        raise ValueError(f"limit must be between 1 and {max_page_size}")
+    return limit
+
+
+def check_conflicts(filters):
+    """Raise ValueError (a 422 for the views) for parsed filters that can never match."""
+    # simple conflict detection: e.g., parsed has min_length > max_length if both present
+    if 'min_length' in filters and 'max_length' in filters:
+        if filters['min_length'] > filters['max_length']:
+            raise ValueError("Conflicting filters in parsed query")
+
+    if 'contains_character' in filters and \
+            filters.get('contains_character') == filters.get('excludes_character'):
+        raise ValueError("Conflicting filters in parsed query")
+
+    ch = filters.get('contains_character')
+    if ch is not None and len(ch) != 1:
+        raise ValueError("parsed contains_character not single char")
+
+
+def compile_filters(filters, qs=None):
+    """
+    Build one queryset from the filter dict shared by the list view
+    (filters_applied) and the natural-language view (parsed_filters).
+    """
+    qs = AnalyzedString.objects.all() if qs is None else qs
+    if filters.get('is_palindrome') is not None:
+        qs = qs.filter(is_palindrome=filters['is_palindrome'])
+    if filters.get('word_count') is not None:
+        qs = qs.filter(word_count=filters['word_count'])
+    if filters.get('min_length') is not None:
+        qs = qs.filter(length__gte=filters['min_length'])
+    if filters.get('max_length') is not None:
+        qs = qs.filter(length__lte=filters['max_length'])
+    if filters.get('contains_character') is not None:
+        # indexed join on the StringCharacter side table (one row per string/char)
+        qs = qs.filter(characters__char=filters['contains_character'])
+    if filters.get('excludes_character') is not None:
+        qs = qs.exclude(characters__char=filters['excludes_character'])
+    return qs
+
+
+def project(qs, fields):
+    """
+    Restrict `qs` to the columns `fields` needs, as plain dicts. id and
+    created_at are always selected (keyset cursors need them). The frequency
+    map comes back as its raw JSON text so format_rows can decode a whole
+    batch with a single json.loads, or as the packed bytes for rows stored
+    compactly. Neither column is read unless the map is requested.
+    """
+    columns = ['id', 'created_at', *(f for f in fields if f not in ('created_at', 'character_frequency_map'))]
+    if 'value' in fields:
+        columns.append('value_file')  # uploads stored as files have value_url instead
+    if 'character_frequency_map' in fields:
+        qs = qs.annotate(frequency_json=Cast('character_frequency_map', output_field=TextField()))
+        columns += ['frequency_json', 'frequency_packed']
+    return qs.values(*columns)
+
+
+def _format_created_at(dt):
+    text = dt.isoformat()
+    return text.replace('+00:00', 'Z') if dt.tzinfo else text + 'Z'
+
+
+def format_rows(rows, fields):
+    """
+    Same shape as AnalyzedString.to_representation, built from project()
+    rows without instantiating models, limited to `fields`.
+    """
+    rows = list(rows)
+    if 'character_frequency_map' in fields and rows:
+        # packed rows have no JSON: decode those one by one in place of its null
+        maps = json.loads('[' + ','.join(row['frequency_json'] or 'null' for row in rows) + ']')
+        for i, row in enumerate(rows):
+            if maps[i] is None and row['frequency_packed'] is not None:
+                maps[i] = unpack_frequency_map(row['frequency_packed'])
+    else:
+        maps = None
+    properties = [f for f in PROPERTY_FIELDS if f in fields]
+    with_value = 'value' in fields
+    with_created = 'created_at' in fields
+
+    out = []
+    for i, row in enumerate(rows):
+        props = {}
+        for name in properties:
+            props[name] = maps[i] if name == 'character_frequency_map' else row[name]
+        item = {"id": row['id']}
+        if with_value:
+            item["value"] = row['value']
+        item["properties"] = props
+        if with_created:
+            item["created_at"] = _format_created_at(row['created_at'])
+        if with_value and row['value_file']:
+            item["value_url"] = default_storage.url(row['value_file'])
+        out.append(item)
+    return out
+
+
+async def aiter_formatted(rows, fields, chunk_size=500):
+    """iter_formatted over an async iterator of rows (async queryset iteration)."""
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            for item in format_rows(batch, fields):
+                yield item
+            batch = []
+    for item in format_rows(batch, fields):
+        yield item
+
+
+def iter_formatted(rows, fields, chunk_size=500):
+    """format_rows over an iterator of rows, one batch of `chunk_size` at a time."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield from format_rows(batch, fields)
+            batch = []
+    if batch:
+        yield from format_rows(batch, fields)
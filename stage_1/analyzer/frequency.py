@@ -0,0 +1,87 @@
+"""
+Compact binary encoding of character_frequency_map, used for the
+frequency_packed column when ANALYZER_COMPACT_FREQUENCY_MAP is on.
+
+Layout: a version byte, a byte naming how the characters are encoded
+(latin-1, UTF-16 or UTF-32: the narrowest that fits every character), a
+byte naming the integer width of the counts, then the characters as one
+string in that encoding followed by the counts as little-endian unsigned
+integers, in the map's order. ASCII text with counts under 256 costs two
+bytes per distinct character, where the JSON object spends at least eight
+('"a": 1, '), and decoding is one str decode and a dict(zip()) instead of
+a JSON parse.
+"""
+import sys
+from array import array
+
+FORMAT_VERSION = 1
+# by the header byte that names them: character encodings (1, 2 and 4 bytes
+# per character) and count widths (1, 2, 4 and 8 bytes)
+_ENCODINGS = ('latin-1', 'utf-16-le', 'utf-32-le')
+_CHAR_LIMITS = (0x100, 0x10000, 0x110000)
+_TYPECODES = ('B', 'H', 'I', 'Q')
+_SWAP = sys.byteorder == 'big'
+
+
+def _count_typecode(largest):
+    for index, code in enumerate(_TYPECODES):
+        if largest < 1 << (8 * array(code).itemsize):
+            return index
+    raise OverflowError(f"{largest} does not fit in 64 bits")
+
+
+def pack_frequency_map(freq: dict) -> bytes:
+    chars = ''.join(freq)
+    largest = max(map(ord, chars), default=0)
+    enc_index = next(i for i, limit in enumerate(_CHAR_LIMITS) if largest < limit)
+    counts = list(freq.values())
+    n_index = _count_typecode(max(counts, default=0))
+    counts = array(_TYPECODES[n_index], counts)
+    if _SWAP:
+        counts.byteswap()
+    # surrogatepass: lone surrogates are valid str characters (and JSON escapes)
+    encoded = chars.encode(_ENCODINGS[enc_index], 'surrogatepass')
+    return bytes((FORMAT_VERSION, enc_index, n_index)) + encoded + counts.tobytes()
+
+
+def unpack_frequency_map(data) -> dict:
+    """Inverse of pack_frequency_map; `data` may be bytes or a memoryview (PostgreSQL)."""
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(f"unknown frequency map format {data[0]}")
+    enc_index, n_index = data[1], data[2]
+    char_size = 1 << enc_index
+    n_size = 1 << n_index
+    split = 3 + (len(data) - 3) // (char_size + n_size) * char_size
+    chars = data[3:split].decode(_ENCODINGS[enc_index], 'surrogatepass')
+    if n_size == 1:
+        # iterating bytes already yields the counts
+        return dict(zip(chars, data[split:]))
+    counts = array(_TYPECODES[n_index], data[split:])
+    if _SWAP:
+        counts.byteswap()
+    return dict(zip(chars, counts))
+
+
+def convert_rows(model, compact, batch_size=500):
+    """
+    Move every stored map of `model` (AnalyzedString, or its historical
+    version in a migration) into the packed column when `compact` is true,
+    or back into the JSON column when it is false.
+    """
+    source = 'character_frequency_map' if compact else 'frequency_packed'
+    pending = model.objects.filter(**{f'{source}__isnull': False}).order_by()
+    while True:
+        # converted rows drop out of `pending`, so each query picks up the next batch
+        batch = list(pending.only('id', source)[:batch_size])
+        if not batch:
+            return
+        for obj in batch:
+            if compact:
+                obj.frequency_packed = pack_frequency_map(obj.character_frequency_map)
+                obj.character_frequency_map = None
+            else:
+                obj.character_frequency_map = unpack_frequency_map(obj.frequency_packed)
+                obj.frequency_packed = None
+        model.objects.bulk_update(batch, ['character_frequency_map', 'frequency_packed'])
@@ -0,0 +1,36 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import sync_and_async_middleware
+
+
+# streamed to disk by UploadStringView, so it gets ANALYZER_MAX_UPLOAD_SIZE
+UPLOAD_PATH = '/strings/upload'
+
+
+@sync_and_async_middleware
+def body_size_limit(get_response):
+    """
+    Reject requests whose Content-Length exceeds ANALYZER_MAX_BODY_SIZE
+    (ANALYZER_MAX_UPLOAD_SIZE for uploads) with 413 before the body is read,
+    instead of buffering it first.
+    """
+    def reject(request):
+        length = request.META.get('CONTENT_LENGTH')
+        if not length or not length.isdigit():
+            return None
+        if request.path_info == UPLOAD_PATH:
+            limit = settings.ANALYZER_MAX_UPLOAD_SIZE
+        else:
+            limit = settings.ANALYZER_MAX_BODY_SIZE
+        if int(length) <= limit:
+            return None
+        return JsonResponse({"detail": f"Request body exceeds {limit} bytes"}, status=413)
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return reject(request) or await get_response(request)
+    else:
+        def middleware(request):
+            return reject(request) or get_response(request)
+    return middleware
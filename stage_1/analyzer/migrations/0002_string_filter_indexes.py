@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['-created_at', '-id'], name='analyzer_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['word_count', 'length'], name='analyzer_words_length_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['length'], name='analyzer_length_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(condition=models.Q(('is_palindrome', True)), fields=['-created_at', '-id'], name='analyzer_palindrome_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_character_index(apps, schema_editor):
+    AnalyzedString = apps.get_model('analyzer', 'AnalyzedString')
+    StringCharacter = apps.get_model('analyzer', 'StringCharacter')
+    rows = []
+    for pk, freq in AnalyzedString.objects.values_list('id', 'character_frequency_map').iterator(chunk_size=500):
+        rows.extend(StringCharacter(string_id=pk, char=ch, count=n) for ch, n in freq.items())
+        if len(rows) >= 5000:
+            StringCharacter.objects.bulk_create(rows)
+            rows = []
+    StringCharacter.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0002_string_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StringCharacter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('char', models.CharField(max_length=1)),
+                ('count', models.PositiveIntegerField()),
+                ('string', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='characters', to='analyzer.analyzedstring')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['char', 'string'], name='analyzer_char_string_idx')],
+                'constraints': [models.UniqueConstraint(fields=('string', 'char'), name='analyzer_string_char_unique')],
+            },
+        ),
+        migrations.RunPython(build_character_index, migrations.RunPython.noop),
+    ]
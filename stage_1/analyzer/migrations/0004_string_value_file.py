@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_string_character_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='value_file',
+            field=models.FileField(blank=True, upload_to='strings/'),
+        ),
+        migrations.AlterField(
+            model_name='analyzedstring',
+            name='value',
+            field=models.TextField(null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:58
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+from analyzer.stats import CHAR, LENGTH, PALINDROME, TOTAL, WORD_COUNT, length_bucket
+
+
+def build_stats(apps, schema_editor):
+    AnalyzedString = apps.get_model('analyzer', 'AnalyzedString')
+    StringCharacter = apps.get_model('analyzer', 'StringCharacter')
+    StringStat = apps.get_model('analyzer', 'StringStat')
+    counts = Counter()
+    rows = AnalyzedString.objects.values_list('is_palindrome', 'length', 'word_count')
+    for is_palindrome, length, word_count in rows.iterator(chunk_size=2000):
+        counts[(TOTAL, '')] += 1
+        counts[(PALINDROME, 'true' if is_palindrome else 'false')] += 1
+        counts[(LENGTH, str(length_bucket(length)))] += 1
+        counts[(WORD_COUNT, str(word_count))] += 1
+    for ch, total in StringCharacter.objects.values_list('char').annotate(total=Sum('count')):
+        counts[(CHAR, ch)] = total
+    StringStat.objects.bulk_create(
+        [StringStat(kind=kind, key=key, count=n) for (kind, key), n in counts.items()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_string_value_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StringStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('key', models.CharField(max_length=32)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='analyzer_stat_kind_key_unique')],
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
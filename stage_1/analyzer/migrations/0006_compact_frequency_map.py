@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+from analyzer.frequency import convert_rows
+
+
+def pack_existing_maps(apps, schema_editor):
+    # existing rows follow the setting; later switches need convert_rows() by hand
+    if getattr(settings, 'ANALYZER_COMPACT_FREQUENCY_MAP', False):
+        convert_rows(apps.get_model('analyzer', 'AnalyzedString'), compact=True)
+
+
+def unpack_maps(apps, schema_editor):
+    convert_rows(apps.get_model('analyzer', 'AnalyzedString'), compact=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_string_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='frequency_packed',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='analyzedstring',
+            name='character_frequency_map',
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(pack_existing_maps, unpack_maps),
+    ]
@@ -1,56 +1,103 @@
-from django.db import models
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import F, Sum
+from django.db.models.constants import OnConflict
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
-import hashlib
-import json
+from .offload import analysis_pool
+from .cache import query_cache, representation_cache
+from .frequency import pack_frequency_map, unpack_frequency_map
+from .stats import CHAR, LENGTH, PALINDROME, TOTAL, WORD_COUNT, length_bucket, string_deltas
 
 class AnalyzedString(models.Model):
     # Use sha256 hash as primary key (64 hex chars)
     id = models.CharField(max_length=64, primary_key=True, editable=False)
-    # raw string value (unique to avoid duplicates)
-    value = models.TextField(unique=True)
+    # raw string value (unique to avoid duplicates); NULL when it is in value_file
+    value = models.TextField(unique=True, null=True)
+    # very large uploaded values (POST /strings/upload) are stored as files instead
+    value_file = models.FileField(upload_to='strings/', blank=True)
     # Stored computed properties (mirrors the other fields for convenience)
     length = models.PositiveIntegerField()
     is_palindrome = models.BooleanField()
     unique_characters = models.PositiveIntegerField()
     word_count = models.PositiveIntegerField()
     sha256_hash = models.CharField(max_length=64)  # duplicate of id for clarity
-    character_frequency_map = models.JSONField()
+    # Exactly one of these holds the map: the JSON object, or with
+    # ANALYZER_COMPACT_FREQUENCY_MAP the packed encoding of frequency.py.
+    # Read it through frequency_map(), which decodes whichever is set.
+    character_frequency_map = models.JSONField(null=True)
+    frequency_packed = models.BinaryField(null=True)
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
+        # Chosen for the queries the list / natural-language views issue:
+        # equality on word_count with an optional length range, length ranges
+        # alone, and newest-first (keyset) ordering with or without the
+        # palindrome filter. is_palindrome alone is too unselective for a
+        # full index, so palindromes get a partial one (ignored on backends
+        # without partial index support).
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='analyzer_created_id_idx'),
+            models.Index(fields=['word_count', 'length'], name='analyzer_words_length_idx'),
+            models.Index(fields=['length'], name='analyzer_length_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_palindrome=True),
+                         name='analyzer_palindrome_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        # Compute SHA256
-        sha = hashlib.sha256(self.value.encode('utf-8')).hexdigest()
-        self.id = sha
-        self.sha256_hash = sha
-
-        # Compute length
-        self.length = len(self.value)
-
-        # Word count (split on whitespace)
-        self.word_count = len(self.value.split())
+        # A new instance may carry the hash the view already computed for its
+        # duplicate check; reuse it instead of hashing the value a second time.
+        # Very large values are analysed in a separate process (offload.py).
+        # Uploads arrive already analysed (and may have no value in memory).
+        analysed = self._state.adding and self.frequency_map() is not None
+        if not analysed:
+            sha = self.sha256_hash if self._state.adding and self.sha256_hash else None
+            for field, value in analysis_pool.analyze(self.value, sha256=sha).items():
+                setattr(self, field, value)
+        self.set_frequency_map(self.frequency_map())
 
-        # Unique characters (case-sensitive)
-        self.unique_characters = len(set(self.value))
+        adding = self._state.adding
+        with transaction.atomic():
+            # whatever row this save replaces (Django also updates when adding
+            # an instance whose pk exists) comes out of the running stats
+            previous = AnalyzedString.objects.filter(pk=self.pk).only(
+                'is_palindrome', 'length', 'word_count', 'character_frequency_map', 'frequency_packed').first()
+            super().save(*args, **kwargs)
+            # keep the character index in step with character_frequency_map
+            if not adding:
+                StringCharacter.objects.filter(string_id=self.id).delete()
+            StringCharacter.insert(self.character_rows())
+            deltas = string_deltas(self)
+            if previous is not None:
+                deltas.subtract(string_deltas(previous))
+            StringStat.add(deltas)
 
-        # Character frequency map (case-sensitive, counts each exact char)
-        freq = {}
-        for ch in self.value:
-            freq[ch] = freq.get(ch, 0) + 1
-        self.character_frequency_map = freq
+    def frequency_map(self):
+        """The character frequency map as a dict, decoding the packed column if that is the one set."""
+        if self.character_frequency_map is not None:
+            return self.character_frequency_map
+        if self.frequency_packed is not None:
+            return unpack_frequency_map(self.frequency_packed)
+        return None
 
-        # Palindrome: case-insensitive, ignore non-alphanumeric
-        import re
-        cleaned = re.sub(r'[^0-9a-zA-Z]', '', self.value).lower()
-        self.is_palindrome = cleaned == cleaned[::-1]
+    def set_frequency_map(self, freq):
+        """Store `freq` in the column ANALYZER_COMPACT_FREQUENCY_MAP selects, clearing the other."""
+        if getattr(settings, 'ANALYZER_COMPACT_FREQUENCY_MAP', False):
+            self.character_frequency_map, self.frequency_packed = None, pack_frequency_map(freq)
+        else:
+            self.character_frequency_map, self.frequency_packed = freq, None
 
-        super().save(*args, **kwargs)
+    def character_rows(self):
+        """(string_id, char, count) rows of this string for StringCharacter.insert()."""
+        return [(self.id, ch, n) for ch, n in self.frequency_map().items()]
 
     def to_representation(self):
         # convenience method for responses
-        return {
+        representation = {
             "id": self.sha256_hash,
             "value": self.value,
             "properties": {
@@ -59,7 +106,160 @@ class AnalyzedString(models.Model):
                 "unique_characters": self.unique_characters,
                 "word_count": self.word_count,
                 "sha256_hash": self.sha256_hash,
-                "character_frequency_map": self.character_frequency_map,
+                "character_frequency_map": self.frequency_map(),
             },
             "created_at": self.created_at.isoformat().replace('+00:00', 'Z') if self.created_at.tzinfo else self.created_at.isoformat() + "Z"
         }
+        if self.value_file:
+            representation["value_url"] = self.value_file.url
+        return representation
+
+
+class StringCharacter(models.Model):
+    """
+    One row per distinct character of an AnalyzedString, so contains_character
+    filters are an indexed join instead of parsing every row's JSON map (which
+    is what character_frequency_map__has_key does on SQLite). Rows go away
+    with their string through the cascade.
+    """
+    # no separate FK index: the (string, char) unique constraint already leads with it
+    string = models.ForeignKey(AnalyzedString, on_delete=models.CASCADE, related_name='characters', db_index=False)
+    char = models.CharField(max_length=1)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['string', 'char'], name='analyzer_string_char_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['char', 'string'], name='analyzer_char_string_idx'),
+        ]
+
+    @classmethod
+    def insert(cls, rows, batch_size=5000):
+        """
+        Insert (string_id, char, count) tuples with one executemany per batch,
+        skipping rows that already exist. There is one row per distinct
+        character of every string, so building a model instance for each
+        (as bulk_create does) would cost more than the string itself.
+        """
+        if not rows:
+            return
+        qn = connection.ops.quote_name
+        fields = [cls._meta.get_field(name) for name in ('string', 'char', 'count')]
+        sql = (
+            f"{connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)} {qn(cls._meta.db_table)} "
+            f"({', '.join(qn(f.column) for f in fields)}) VALUES (%s, %s, %s) "
+            f"{connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None)}"
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(sql, rows[start:start + batch_size])
+
+
+class StringStat(models.Model):
+    """
+    Running totals behind GET /strings/stats, one row per (kind, key): the
+    string count, counts by palindrome status, by power-of-two length bucket
+    and by word count, and character occurrences over all strings (see
+    stats.py). save(), delete and bulk_create_strings add their changes as
+    they go, so reading the stats never scans AnalyzedString.
+    """
+    kind = models.CharField(max_length=16)
+    key = models.CharField(max_length=32)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='analyzer_stat_kind_key_unique'),
+        ]
+
+    @classmethod
+    def add(cls, deltas):
+        """Add a {(kind, key): delta} mapping to the counters, creating missing rows."""
+        rows = [(kind, key, delta) for (kind, key), delta in deltas.items() if delta]
+        if not rows:
+            return
+        if connection.vendor in ('sqlite', 'postgresql'):
+            # one statement for every counter, atomic against concurrent writers
+            qn = connection.ops.quote_name
+            table = qn(cls._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table} ({qn('kind')}, {qn('key')}, {qn('count')}) VALUES (%s, %s, %s) "
+                    f"ON CONFLICT ({qn('kind')}, {qn('key')}) "
+                    f"DO UPDATE SET {qn('count')} = {table}.{qn('count')} + excluded.{qn('count')}",
+                    rows,
+                )
+        else:
+            for kind, key, delta in rows:
+                if not cls.objects.filter(kind=kind, key=key).update(count=F('count') + delta):
+                    cls.objects.create(kind=kind, key=key, count=delta)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every counter from the stored strings (for drift after races or raw SQL)."""
+        counts = Counter()
+        with transaction.atomic():
+            cls.objects.all().delete()
+            rows = AnalyzedString.objects.values_list('is_palindrome', 'length', 'word_count')
+            for is_palindrome, length, word_count in rows.iterator(chunk_size=2000):
+                counts[(TOTAL, '')] += 1
+                counts[(PALINDROME, 'true' if is_palindrome else 'false')] += 1
+                counts[(LENGTH, str(length_bucket(length)))] += 1
+                counts[(WORD_COUNT, str(word_count))] += 1
+            for ch, total in StringCharacter.objects.values_list('char').annotate(total=Sum('count')):
+                counts[(CHAR, ch)] = total
+            cls.add(counts)
+
+def bulk_create_strings(objs, batch_size=1000):
+    """
+    bulk_create AnalyzedString rows (already analysed; save() is not called)
+    together with their StringCharacter rows. Existing rows are skipped.
+    Returns the set of ids actually inserted.
+    """
+    for obj in objs:
+        obj.set_frequency_map(obj.frequency_map())
+    with transaction.atomic():
+        AnalyzedString.objects.bulk_create(objs, batch_size=batch_size, ignore_conflicts=True)
+        # ignore_conflicts does not say which rows went in. A row is ours when
+        # it carries our created_at: checking after the insert, rather than
+        # looking for existing rows before it, also catches rows another
+        # request inserted in between.
+        stored = dict(AnalyzedString.objects.filter(id__in=[obj.id for obj in objs]).values_list('id', 'created_at'))
+        new = []
+        for obj in objs:
+            if stored.get(obj.id) == obj.created_at:
+                del stored[obj.id]  # a repeated id in `objs` was not inserted twice
+                new.append(obj)
+        # existing strings already have their character rows
+        StringCharacter.insert([row for obj in new for row in obj.character_rows()])
+        deltas = Counter()
+        for obj in new:
+            string_deltas(obj, deltas=deltas)
+        StringStat.add(deltas)
+    # bulk_create sends no post_save, so invalidate cached query results here
+    # (once committed, or a reader could cache pre-commit rows under the new generation)
+    transaction.on_commit(query_cache.bump)
+    return {obj.id for obj in new}
+
+
+@receiver(post_delete, sender=AnalyzedString)
+def remove_from_stats(sender, instance, **kwargs):
+    StringStat.add(string_deltas(instance, -1))
+
+
+@receiver(post_delete, sender=AnalyzedString)
+def delete_value_file(sender, instance, **kwargs):
+    if instance.value_file:
+        instance.value_file.delete(save=False)
+
+
+@receiver(post_save, sender=AnalyzedString)
+@receiver(post_delete, sender=AnalyzedString)
+def invalidate_caches(sender, instance, **kwargs):
+    # not before commit: a read in between would cache the old row (or the
+    # old query result, under the new generation) again
+    pk = instance.pk
+    transaction.on_commit(lambda: representation_cache.discard(pk))
+    transaction.on_commit(query_cache.bump)
@@ -0,0 +1,123 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .analysis import analyze, analyze_chunked
+
+
+class AnalysisPool:
+    """
+    Runs analysis of strings of at least `threshold` characters in a process
+    pool, so a huge payload does not hold the GIL (and stall every other
+    thread of the worker) for the whole computation. Smaller strings are
+    analysed inline, where the round-trip to a process would cost more than
+    the work.
+
+    The pool is created on first use, and created again after a worker
+    dies (an OOM kill on a huge string, say): a dead worker breaks the whole
+    ProcessPoolExecutor, so the broken one is dropped rather than failing
+    every later call. `pending` counts analyses submitted but not finished:
+    the pool's queue depth; `restarts` counts pools dropped as broken.
+    """
+
+    def __init__(self, threshold=1 << 20, workers=2, chunk_size=1 << 20):
+        self.threshold = threshold
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.restarts = 0
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a threaded server process is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def analyze(self, value, sha256=None):
+        """analyze(), in the pool when `value` is at least `threshold` characters."""
+        if len(value) < self.threshold:
+            return analyze(value, sha256=sha256)
+        try:
+            return self._run(value, sha256)
+        except BrokenProcessPool:
+            # A worker died: before this call (the pool may not have noticed
+            # when it took the job) or running it. Either way the pool is
+            # dropped, and the analysis gets one more go in a fresh one.
+            return self._run(value, sha256)
+
+    def _run(self, value, sha256):
+        executor = self.executor
+        try:
+            future = executor.submit(analyze_chunked, value, sha256, self.chunk_size)
+        except BrokenProcessPool:
+            self._drop(executor, failed=1)
+            raise
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+        future.add_done_callback(self._done)
+        try:
+            # the calling thread just waits here, without holding the GIL
+            return future.result()
+        except BrokenProcessPool:
+            # _done counted the failure
+            self._drop(executor)
+            raise
+
+    def _drop(self, executor, failed=0):
+        with self._lock:
+            self.failed += failed
+            # another thread may already have replaced it
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+            else:
+                return
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def stats(self):
+        return {
+            "threshold": self.threshold,
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "restarts": self.restarts,
+        }
+
+
+analysis_pool = AnalysisPool(
+    threshold=getattr(settings, 'ANALYZER_OFFLOAD_THRESHOLD', 1 << 20),
+    workers=getattr(settings, 'ANALYZER_OFFLOAD_WORKERS', 2),
+    chunk_size=getattr(settings, 'ANALYZER_OFFLOAD_CHUNK_SIZE', 1 << 20),
+)
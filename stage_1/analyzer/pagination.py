@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Keyset order for list endpoints: newest first, id breaks created_at ties.
+KEYSET_ORDERING = ('-created_at', '-id')
+
+
+def encode_cursor(row) -> str:
+    """Cursor for a model instance or a .values() row."""
+    if isinstance(row, dict):
+        created_at, pk = row['created_at'], row['id']
+    else:
+        created_at, pk = row.created_at, row.id
+    raw = json.dumps([created_at.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(pk)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor("invalid cursor")
+
+
+def apply_keyset(qs, cursor=None):
+    """
+    Order `qs` by (created_at, id) descending and, given the cursor of the last
+    row a client saw, keep only the rows after it. Seeks on the ordering
+    columns rather than using OFFSET, so every page costs the same.
+    """
+    qs = qs.order_by(*KEYSET_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return qs
+
+
+def paginate(qs, limit, cursor=None):
+    """Return (rows, next_cursor) for one page; next_cursor is None on the last page."""
+    rows = list(apply_keyset(qs, cursor)[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+async def apaginate(qs, limit, cursor=None):
+    """paginate() through async queryset iteration."""
+    rows = [row async for row in apply_keyset(qs, cursor)[:limit + 1]]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
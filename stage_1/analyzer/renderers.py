@@ -0,0 +1,51 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation accept `?format=ndjson` or
+    `Accept: application/x-ndjson`. Views that see it selected return a
+    StreamingHttpResponse built by `stream_ndjson` instead of a Response.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # only reached for error bodies; stream_ndjson handles the data path
+        return (json.dumps(data) + "\n").encode('utf-8')
+
+
+def stream_ndjson(items, batch_size=500, headers=None):
+    """
+    Stream an iterable of dicts as NDJSON, one write per `batch_size` lines.
+    `items` may also be an async iterable, for responses from async views.
+    """
+    def lines():
+        buf = []
+        for item in items:
+            buf.append(json.dumps(item))
+            if len(buf) >= batch_size:
+                yield "\n".join(buf) + "\n"
+                buf = []
+        if buf:
+            yield "\n".join(buf) + "\n"
+
+    async def alines():
+        buf = []
+        async for item in items:
+            buf.append(json.dumps(item))
+            if len(buf) >= batch_size:
+                yield "\n".join(buf) + "\n"
+                buf = []
+        if buf:
+            yield "\n".join(buf) + "\n"
+
+    content = alines() if hasattr(items, '__aiter__') else lines()
+    response = StreamingHttpResponse(content, content_type=NDJSONRenderer.media_type)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
@@ -0,0 +1,61 @@
+from collections import Counter
+
+# StringStat kinds
+TOTAL = 'total'
+PALINDROME = 'palindrome'
+LENGTH = 'length'
+WORD_COUNT = 'word_count'
+CHAR = 'char'
+
+
+def length_bucket(length: int) -> int:
+    """Lower bound of the power-of-two bucket `length` falls in: 0, 1, 2-3, 4-7, 8-15, ..."""
+    return 1 << (length.bit_length() - 1) if length else 0
+
+
+def string_deltas(obj, sign=1, deltas=None) -> Counter:
+    """
+    The StringStat changes one analysed string accounts for, keyed on
+    (kind, key): `sign` 1 when it is added, -1 when it is removed. Pass
+    `deltas` to add them to an existing Counter (the bulk path does, for
+    every string in a batch).
+    """
+    if deltas is None:
+        deltas = Counter()
+    deltas[(TOTAL, '')] += sign
+    deltas[(PALINDROME, 'true' if obj.is_palindrome else 'false')] += sign
+    deltas[(LENGTH, str(length_bucket(obj.length)))] += sign
+    deltas[(WORD_COUNT, str(obj.word_count))] += sign
+    for ch, n in obj.frequency_map().items():
+        deltas[(CHAR, ch)] += sign * n
+    return deltas
+
+
+def summarize(rows) -> dict:
+    """GET /strings/stats body from (kind, key, count) StringStat rows."""
+    by_kind = {kind: {} for kind in (TOTAL, PALINDROME, LENGTH, WORD_COUNT, CHAR)}
+    for kind, key, count in rows:
+        if count:
+            by_kind[kind][key] = count
+
+    histogram = []
+    for low in sorted(int(key) for key in by_kind[LENGTH]):
+        high = max(low * 2 - 1, low)
+        histogram.append({
+            "min_length": low,
+            "max_length": high,
+            "count": by_kind[LENGTH][str(low)],
+        })
+    return {
+        "total_strings": by_kind[TOTAL].get('', 0),
+        "palindromes": {
+            "true": by_kind[PALINDROME].get('true', 0),
+            "false": by_kind[PALINDROME].get('false', 0),
+        },
+        "length_histogram": histogram,
+        "word_count_distribution": {
+            key: by_kind[WORD_COUNT][key] for key in sorted(by_kind[WORD_COUNT], key=int)
+        },
+        # occurrences over every stored string, most frequent first
+        "character_frequency": dict(sorted(by_kind[CHAR].items(), key=lambda item: (-item[1], item[0]))),
+    }
@@ -1,3 +1,545 @@
-from django.test import TestCase
+import contextlib
+import json
+import os
+import re
+import shutil
+import signal
+import tempfile
 
-# Create your tests here.
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .analysis import StreamingAnalysis, analyze, analyze_chunked, is_palindrome_file, sha256_hex
+from .cache import LRUCache, query_cache, representation_cache
+from .frequency import convert_rows, pack_frequency_map, unpack_frequency_map
+from .models import AnalyzedString, StringCharacter, StringStat, bulk_create_strings
+from .offload import analysis_pool
+from .pagination import apply_keyset
+from .utils import NLParseError, parse_nl_query
+
+
+class AnalysisTests(SimpleTestCase):
+    def test_matches_regex_palindrome_rule(self):
+        for value in ["A man, a plan, a canal: Panama", "racecar", "abc", "été", "", "No 'x' in Nixon!"]:
+            cleaned = re.sub(r'[^0-9a-zA-Z]', '', value).lower()
+            self.assertEqual(analyze(value)["is_palindrome"], cleaned == cleaned[::-1], value)
+
+    def test_properties(self):
+        props = analyze("hello world")
+        self.assertEqual(props["length"], 11)
+        self.assertEqual(props["word_count"], 2)
+        self.assertEqual(props["unique_characters"], 8)
+        self.assertEqual(props["character_frequency_map"]["l"], 3)
+        self.assertEqual(props["id"], sha256_hex("hello world"))
+
+    def test_precomputed_hash_is_used(self):
+        self.assertEqual(analyze("abc", sha256="f" * 64)["sha256_hash"], "f" * 64)
+
+    def test_chunked_matches_analyze(self):
+        for value in ["", "racecar", "hello  wide world ", " Was it a car or a cat I saw? ", "été\tà  la plage"]:
+            for chunk_size in (1, 2, 3, 7):
+                self.assertEqual(analyze_chunked(value, chunk_size=chunk_size), analyze(value), (value, chunk_size))
+
+    def test_streaming_matches_analyze(self):
+        for value in ["", "a", "Abba", "abca", "Never odd or even", "1 2 1 2", "x" * 1000 + "y"]:
+            for chunk_size in (1, 3, 100):
+                analysis = StreamingAnalysis()
+                for start in range(0, len(value), chunk_size):
+                    analysis.update(value[start:start + chunk_size])
+                self.assertEqual(analysis.result(), analyze(value), (value, chunk_size))
+
+    def test_palindrome_check_of_a_file(self):
+        values = ["", "a", "ab", "Abba", "abca", "Never odd or even", "x" * 1000 + "y", "été!", "é a,b é B A",
+                  "1 2 1 2", "A man, a plan, a canal: Panama", "ñ" * 7 + "ab" + "…" * 9 + "bA"]
+        for value in values:
+            data = value.encode('utf-8')
+            for chunk_size in (1, 2, 3, 5, 1 << 16):
+                with tempfile.TemporaryFile() as f:
+                    f.write(data + b"trailing bytes past size")
+                    self.assertEqual(is_palindrome_file(f, len(data), chunk_size), analyze(value)["is_palindrome"],
+                                     (value, chunk_size))
+
+
+class CreateStringTests(TestCase):
+    def test_create_and_conflict(self):
+        response = self.client.post('/strings', {"value": "level"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["id"], sha256_hex("level"))
+        self.assertTrue(response.json()["properties"]["is_palindrome"])
+
+        response = self.client.post('/strings', {"value": "level"}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_save_computes_hash_when_not_given(self):
+        obj = AnalyzedString(value="abc")
+        obj.save()
+        self.assertEqual(obj.pk, sha256_hex("abc"))
+
+
+class BulkCreateTests(TestCase):
+    def test_json_array_reports_status_per_item(self):
+        AnalyzedString(value="old").save()
+        response = self.client.post('/strings/bulk', ["new", {"value": "other"}, "old", "new", 5],
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        statuses = [r["status"] for r in response.json()["results"]]
+        self.assertEqual(statuses, ["created", "created", "conflict", "conflict", "invalid"])
+        self.assertEqual(AnalyzedString.objects.count(), 3)
+        self.assertFalse(AnalyzedString.objects.get(value="new").is_palindrome)
+
+    def test_ndjson(self):
+        body = '"abba"\n{"value": "xyz"}\nnot json\n'
+        response = self.client.post('/strings/bulk', body, content_type='application/x-ndjson')
+        self.assertEqual(response.json()["summary"], {"created": 2, "conflict": 0, "invalid": 1})
+        self.assertTrue(AnalyzedString.objects.get(value="abba").is_palindrome)
+
+    def test_row_inserted_concurrently_is_reported_as_a_conflict(self):
+        def analyze_racing_an_insert(value, sha256=None):
+            # another request stores "abba" after the view's existence check
+            if value == "abba" and not AnalyzedString.objects.filter(id=sha256).exists():
+                AnalyzedString(value=value, **analyze(value)).save()
+            return analyze(value, sha256=sha256)
+
+        with mock.patch.object(analysis_pool, 'analyze', side_effect=analyze_racing_an_insert):
+            response = self.client.post('/strings/bulk', ["abba", "abc"], content_type='application/json')
+        statuses = [r["status"] for r in response.json()["results"]]
+        self.assertEqual(statuses, ["conflict", "created"])
+        self.assertEqual(StringStat.objects.get(kind="total", key="").count, 2)
+
+
+class OffloadTests(TestCase):
+    def setUp(self):
+        self.threshold = analysis_pool.threshold
+        analysis_pool.threshold = 8
+
+    def tearDown(self):
+        analysis_pool.threshold = self.threshold
+        analysis_pool.shutdown()
+
+    def test_large_strings_are_analysed_in_the_pool(self):
+        before = analysis_pool.completed
+        response = self.client.post('/strings', {"value": "never odd or even"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        expected = analyze("never odd or even")
+        del expected["id"]
+        self.assertEqual(response.json()["properties"], expected)
+        self.assertEqual(analysis_pool.completed, before + 1)
+        stats = self.client.get('/strings/metrics').json()["analysis_pool"]
+        self.assertEqual((stats["pending"], stats["started"]), (0, True))
+
+    def test_pool_is_replaced_after_a_worker_dies(self):
+        analysis_pool.analyze("never odd or even")
+        executor = analysis_pool._executor
+        process = next(iter(executor._processes.values()))
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+        failed, restarts = analysis_pool.failed, analysis_pool.restarts
+
+        self.assertEqual(analysis_pool.analyze("never odd or even"), analyze("never odd or even"))
+        self.assertIsNot(analysis_pool._executor, executor)
+        stats = analysis_pool.stats()
+        self.assertEqual((stats["failed"], stats["restarts"], stats["pending"]), (failed + 1, restarts + 1, 0))
+
+    @override_settings(ANALYZER_MAX_BODY_SIZE=16)
+    def test_body_size_limit(self):
+        response = self.client.post('/strings', {"value": "x" * 32}, content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(AnalyzedString.objects.exists())
+
+
+class UploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root, ANALYZER_UPLOAD_CHUNK_SIZE=4,
+                                     ANALYZER_UPLOAD_INLINE_MAX=32, ANALYZER_MAX_UPLOAD_SIZE=256)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_raw_body_matches_create(self):
+        value = "Ünïcode, level"
+        response = self.client.post('/strings/upload', value.encode('utf-8'), content_type='text/plain')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["properties"]["sha256_hash"], sha256_hex(value))
+        self.assertEqual(AnalyzedString.objects.get(id=sha256_hex(value)).value, value)
+        response = self.client.post('/strings/upload', value.encode('utf-8'), content_type='text/plain')
+        self.assertEqual(response.status_code, 409)
+
+    def test_large_multipart_upload_is_stored_as_file(self):
+        value = "a man a plan a canal panama " * 4
+        upload = SimpleUploadedFile("big.txt", value.encode('utf-8'), content_type='text/plain')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/strings/upload', {"file": upload})
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        expected = analyze(value)
+        del expected["id"]
+        self.assertEqual((body["value"], body["properties"]), (None, expected))
+        self.assertTrue(body["value_url"].endswith(f"{sha256_hex(value)}.txt"))
+
+        obj = AnalyzedString.objects.get(id=sha256_hex(value))
+        with obj.value_file.open('rb') as f:
+            self.assertEqual(f.read().decode('utf-8'), value)
+        listed = self.client.get('/strings').json()["data"]
+        self.assertEqual(listed, [obj.to_representation()])
+
+        path = obj.value_file.path
+        self.assertEqual(self.client.delete(f'/strings/{value}').status_code, 204)
+        self.assertFalse(os.path.exists(path))
+
+    def test_rejects_invalid_and_oversized_uploads(self):
+        response = self.client.post('/strings/upload', b"\xff\xfe", content_type='text/plain')
+        self.assertEqual(response.status_code, 422)
+        response = self.client.post('/strings/upload', b"x" * 300, content_type='text/plain')
+        self.assertEqual(response.status_code, 413)
+        upload = SimpleUploadedFile("big.txt", b"x" * 300)
+        self.assertEqual(self.client.post('/strings/upload', {"file": upload}).status_code, 413)
+        self.assertFalse(AnalyzedString.objects.exists())
+
+
+class ListPaginationTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            AnalyzedString(value=f"value {i}").save()
+
+    def test_keyset_pages_cover_every_row_once(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            body = self.client.get('/strings', params).json()
+            seen.extend(item["value"] for item in body["data"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f"value {i}" for i in reversed(range(5))])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/strings', {"limit": 2, "cursor": "nope"}).status_code, 400)
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/strings', {"format": "ndjson", "word_count": 2})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])["value"], "value 4")
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN output format is SQLite-specific")
+class FilterIndexTests(TestCase):
+    def assertUsesIndex(self, qs, index_name):
+        plan = qs.explain()
+        self.assertIn(f"USING INDEX {index_name}", plan)
+
+    def test_list_filters_use_indexes(self):
+        qs = AnalyzedString.objects.all()
+        self.assertUsesIndex(apply_keyset(qs), 'analyzer_created_id_idx')
+        self.assertUsesIndex(apply_keyset(qs.filter(is_palindrome=True)), 'analyzer_palindrome_idx')
+        self.assertUsesIndex(qs.filter(word_count=1, length__gte=3), 'analyzer_words_length_idx')
+        self.assertUsesIndex(qs.filter(length__gte=3, length__lte=10), 'analyzer_length_idx')
+
+
+class CharacterIndexTests(TestCase):
+    def setUp(self):
+        for value in ("zebra", "apple", "Zulu"):
+            AnalyzedString(value=value).save()
+
+    def test_contains_character_is_case_sensitive(self):
+        body = self.client.get('/strings', {"contains_character": "z"}).json()
+        self.assertEqual([item["value"] for item in body["data"]], ["zebra"])
+
+    def test_natural_language_filter_uses_index(self):
+        body = self.client.get('/strings/filter-by-natural-language',
+                               {"query": "strings containing the letter p"}).json()
+        self.assertEqual([item["value"] for item in body["data"]], ["apple"])
+
+    def test_rows_follow_save_and_delete(self):
+        self.assertEqual(StringCharacter.objects.get(string__value="apple", char="p").count, 2)
+        self.client.delete('/strings/apple')
+        self.assertFalse(StringCharacter.objects.filter(string__value="apple").exists())
+
+    def test_bulk_create_indexes_characters(self):
+        self.client.post('/strings/bulk', ["quiz"], content_type='application/json')
+        self.assertEqual(StringCharacter.objects.filter(string__value="quiz").count(), 4)
+
+
+class HashLookupTests(TestCase):
+    def setUp(self):
+        representation_cache.clear()
+        AnalyzedString(value="hello world").save()
+
+    def test_lookup_by_value_and_by_hash(self):
+        by_value = self.client.get('/strings/hello world').json()
+        by_hash = self.client.get(f'/strings/by-hash/{sha256_hex("hello world").upper()}').json()
+        self.assertEqual(by_value, by_hash)
+        self.assertEqual(self.client.get('/strings/by-hash/' + "0" * 64).status_code, 404)
+
+    def test_delete_invalidates_cached_representation(self):
+        self.assertEqual(self.client.get('/strings/hello world').status_code, 200)
+        self.assertIsNotNone(representation_cache.get(sha256_hex("hello world")))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete('/strings/hello world').status_code, 204)
+        self.assertEqual(self.client.get('/strings/hello world').status_code, 404)
+        self.assertEqual(self.client.delete('/strings/hello world').status_code, 404)
+
+    def test_entries_are_not_dropped_before_commit(self):
+        sha = sha256_hex("hello world")
+        self.client.get('/strings/hello world')
+        with self.captureOnCommitCallbacks() as callbacks:
+            AnalyzedString.objects.filter(id=sha).delete()
+            self.assertIsNotNone(representation_cache.get(sha))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(representation_cache.get(sha))
+
+    def test_load_racing_a_delete_is_not_cached(self):
+        epoch = representation_cache.epoch()
+        representation_cache.discard("other")
+        representation_cache.set("stale", {"value": "x"}, epoch)
+        self.assertIsNone(representation_cache.get("stale"))
+
+    def test_entries_expire(self):
+        cache = LRUCache(ttl=0)
+        cache.set("k", 1)
+        self.assertIsNone(cache.get("k"))
+
+
+class QueryCacheTests(TestCase):
+    def setUp(self):
+        AnalyzedString(value="racecar").save()
+
+    def test_list_hits_until_a_write(self):
+        first = self.client.get('/strings', {"is_palindrome": "true"})
+        second = self.client.get('/strings', {"is_palindrome": "true"})
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(first.json(), second.json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyzedString(value="level").save()
+        third = self.client.get('/strings', {"is_palindrome": "true"})
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertEqual(third.json()["count"], 2)
+
+    def test_generation_is_bumped_on_commit(self):
+        generation = query_cache.generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            AnalyzedString(value="level").save()
+            bulk_create_strings([AnalyzedString(value="refer", **analysis_pool.analyze("refer"))])
+            # a list read here would cache the uncommitted rows under the new generation
+            self.assertEqual(query_cache.generation(), generation)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(query_cache.generation(), generation)
+
+    def test_natural_language_queries_share_parsed_filters(self):
+        self.client.get('/strings/filter-by-natural-language', {"query": "palindromic strings"})
+        response = self.client.get('/strings/filter-by-natural-language', {"query": "all palindromic strings"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json()["interpreted_query"]["original"], "all palindromic strings")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/strings/racecar')
+        response = self.client.get('/strings/filter-by-natural-language', {"query": "palindromic strings"})
+        self.assertEqual((response["X-Cache"], response.json()["count"]), ("MISS", 0))
+
+    def test_metrics_reports_hit_rate(self):
+        self.client.get('/strings')
+        self.client.get('/strings')
+        stats = self.client.get('/strings/metrics').json()["query_cache"]
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertIsNotNone(stats["hit_rate"])
+
+
+class ProjectionTests(TestCase):
+    def setUp(self):
+        for value in ("level", "hello world"):
+            AnalyzedString(value=value).save()
+
+    def test_full_projection_matches_model_representation(self):
+        data = self.client.get('/strings').json()["data"]
+        expected = [o.to_representation() for o in AnalyzedString.objects.all()]
+        self.assertEqual(data, expected)
+
+    def test_fields_drop_frequency_map(self):
+        body = self.client.get('/strings', {"fields": "value,length", "limit": 1}).json()
+        self.assertEqual(body["data"][0], {"id": sha256_hex("hello world"), "value": "hello world",
+                                           "properties": {"length": 11}})
+        self.assertIsNotNone(body["next_cursor"])
+
+        data = self.client.get('/strings/filter-by-natural-language',
+                               {"query": "palindromic strings", "fields": "word_count"}).json()["data"]
+        self.assertEqual(data, [{"id": sha256_hex("level"), "properties": {"word_count": 1}}])
+
+    def test_unknown_field(self):
+        self.assertEqual(self.client.get('/strings', {"fields": "value,nope"}).status_code, 400)
+
+
+@override_settings(ANALYZER_COMPACT_FREQUENCY_MAP=True)
+class CompactFrequencyMapTests(TestCase):
+    def test_pack_round_trip(self):
+        for freq in ({}, {"a": 1, "b": 300}, {"é": 2, "😀": 70000}, {"x": 2 ** 40}):
+            self.assertEqual(unpack_frequency_map(memoryview(pack_frequency_map(freq))), freq)
+        self.assertEqual(len(pack_frequency_map({"a": 1, "b": 2})), 3 + 4)
+
+    def test_packed_rows_read_like_json_rows(self):
+        with override_settings(ANALYZER_COMPACT_FREQUENCY_MAP=False):
+            AnalyzedString(value="hello world").save()
+        AnalyzedString(value="level").save()
+        self.client.post('/strings/bulk', ["été"], content_type='application/json')
+        packed = AnalyzedString.objects.get(value="level")
+        self.assertIsNone(packed.character_frequency_map)
+        self.assertEqual(packed.frequency_map(), {"l": 2, "e": 2, "v": 1})
+        self.assertIsNotNone(AnalyzedString.objects.get(value="été").frequency_packed)
+
+        data = self.client.get('/strings').json()["data"]
+        self.assertEqual(data, [o.to_representation() for o in AnalyzedString.objects.all()])
+        self.assertEqual(self.client.get('/strings/été').json()["properties"]["character_frequency_map"],
+                         {"é": 2, "t": 1})
+        self.assertEqual(self.client.get('/strings', {"contains_character": "v"}).json()["count"], 1)
+
+    def test_convert_rows_both_ways(self):
+        with override_settings(ANALYZER_COMPACT_FREQUENCY_MAP=False):
+            for value in ("abc", "racecar"):
+                AnalyzedString(value=value).save()
+        expected = {o.pk: o.frequency_map() for o in AnalyzedString.objects.all()}
+        convert_rows(AnalyzedString, compact=True, batch_size=1)
+        self.assertFalse(AnalyzedString.objects.filter(character_frequency_map__isnull=False).exists())
+        self.assertEqual({o.pk: o.frequency_map() for o in AnalyzedString.objects.all()}, expected)
+        convert_rows(AnalyzedString, compact=False)
+        self.assertFalse(AnalyzedString.objects.filter(frequency_packed__isnull=False).exists())
+        self.assertEqual({o.pk: o.character_frequency_map for o in AnalyzedString.objects.all()}, expected)
+
+
+class StatsTests(TestCase):
+    def stats(self):
+        with self.assertNumQueries(1):
+            return self.client.get('/strings/stats').json()
+
+    def test_counters_follow_writes(self):
+        AnalyzedString(value="level").save()
+        self.client.post('/strings/bulk', ["ab cb", "level", "abc"], content_type='application/json')
+        stats = self.stats()
+        self.assertEqual(stats["total_strings"], 3)
+        self.assertEqual(stats["palindromes"], {"true": 1, "false": 2})
+        self.assertEqual(stats["length_histogram"], [{"min_length": 2, "max_length": 3, "count": 1},
+                                                     {"min_length": 4, "max_length": 7, "count": 2}])
+        self.assertEqual(stats["word_count_distribution"], {"1": 2, "2": 1})
+        self.assertEqual(list(stats["character_frequency"].items())[:2], [("b", 3), ("a", 2)])
+
+        self.client.delete('/strings/level')
+        stats = self.stats()
+        self.assertEqual((stats["total_strings"], stats["palindromes"]["true"]), (2, 0))
+        self.assertNotIn("l", stats["character_frequency"])
+
+    def test_resave_replaces_old_counts(self):
+        obj = AnalyzedString(value="abc")
+        obj.save()
+        obj.save()
+        self.assertEqual(self.stats()["total_strings"], 1)
+
+    def test_rebuild_matches_incremental_counters(self):
+        for value in ("racecar", "hello world", "a"):
+            AnalyzedString(value=value).save()
+        AnalyzedString.objects.filter(value="a").delete()
+        incremental = self.stats()
+        StringStat.rebuild()
+        self.assertEqual(self.stats(), incremental)
+
+
+@override_settings(ROOT_URLCONF='analyzer.async_urls')
+class AsyncViewTests(TestCase):
+    @contextlib.asynccontextmanager
+    async def commit_callbacks(self):
+        # captureOnCommitCallbacks(execute=True) on the thread the async views' ORM calls run in
+        capture = self.captureOnCommitCallbacks(execute=True)
+        await sync_to_async(capture.__enter__)()
+        try:
+            yield
+        finally:
+            await sync_to_async(capture.__exit__)(None, None, None)
+
+    async def test_create_retrieve_delete(self):
+        response = await self.async_client.post('/strings', {"value": "level"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()["properties"]["is_palindrome"])
+        response = await self.async_client.post('/strings', {"value": "level"}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        response = await self.async_client.post('/strings', {"value": 5}, content_type='application/json')
+        self.assertEqual(response.status_code, 422)
+
+        by_value = await self.async_client.get('/strings/level')
+        by_hash = await self.async_client.get(f'/strings/by-hash/{sha256_hex("level")}')
+        self.assertEqual(by_value.json(), by_hash.json())
+
+        async with self.commit_callbacks():
+            self.assertEqual((await self.async_client.delete('/strings/level')).status_code, 204)
+        self.assertEqual((await self.async_client.get('/strings/level')).status_code, 404)
+
+    async def test_list_and_natural_language_match_sync_views(self):
+        for value in ("racecar", "apple", "hello world"):
+            await AnalyzedString.objects.acreate(value=value)
+        body = (await self.async_client.get('/strings', {"limit": 2})).json()
+        self.assertEqual([item["value"] for item in body["data"]], ["hello world", "apple"])
+        rest = (await self.async_client.get('/strings', {"cursor": body["next_cursor"]})).json()
+        self.assertEqual([item["value"] for item in rest["data"]], ["racecar"])
+        self.assertEqual((await self.async_client.get('/strings', {"min_length": "x"})).status_code, 400)
+
+        response = await self.async_client.get('/strings', {"format": "ndjson", "fields": "length"})
+        lines = [json.loads(line) async for chunk in response.streaming_content
+                 for line in chunk.decode().splitlines()]
+        self.assertEqual([line["properties"] for line in lines], [{"length": 11}, {"length": 5}, {"length": 7}])
+
+        response = await self.async_client.get('/strings/filter-by-natural-language',
+                                               {"query": "strings containing the letter p"})
+        self.assertEqual([item["value"] for item in response.json()["data"]], ["apple"])
+        response = await self.async_client.get('/strings/filter-by-natural-language',
+                                               {"query": "strings between 9 and 3 characters"})
+        self.assertEqual(response.status_code, 422)
+
+
+class NaturalLanguageParserTests(SimpleTestCase):
+    def assertParses(self, query, expected):
+        self.assertEqual(parse_nl_query(query)["parsed_filters"], expected)
+
+    def test_original_examples(self):
+        self.assertParses("all single word palindromic strings", {"word_count": 1, "is_palindrome": True})
+        self.assertParses("strings longer than 10 characters", {"min_length": 11})
+        self.assertParses("palindromic strings that contain the first vowel",
+                          {"is_palindrome": True, "contains_character": "a"})
+        self.assertParses("strings containing the letter z", {"contains_character": "z"})
+
+    def test_articles_are_not_characters(self):
+        self.assertParses("strings containing a z", {"contains_character": "z"})
+        self.assertParses("strings that contain an x", {"contains_character": "x"})
+        self.assertParses("palindromes without a letter q", {"is_palindrome": True, "excludes_character": "q"})
+        self.assertParses("strings containing a", {"contains_character": "a"})
+        with self.assertRaises(NLParseError):
+            parse_nl_query("strings that contain a vowel")
+
+    def test_ranges_and_exact_counts(self):
+        self.assertParses("strings between 5 and 10 characters", {"min_length": 5, "max_length": 10})
+        self.assertParses("strings with exactly three words", {"word_count": 3})
+        self.assertParses("Strings   SHORTER than 4", {"max_length": 3})
+
+    def test_negations(self):
+        self.assertParses("non-palindromic strings without the letter e",
+                          {"is_palindrome": False, "excludes_character": "e"})
+        self.assertParses("strings that are not palindromes and do not contain the letter x",
+                          {"is_palindrome": False, "excludes_character": "x"})
+
+    def test_unparseable(self):
+        with self.assertRaises(NLParseError):
+            parse_nl_query("strings with more than 3 words")
+
+
+class NaturalLanguageFilterTests(TestCase):
+    def test_negated_filters(self):
+        for value in ("level", "apple", "banana"):
+            AnalyzedString(value=value).save()
+        body = self.client.get('/strings/filter-by-natural-language',
+                               {"query": "non-palindromic strings without the letter p"}).json()
+        self.assertEqual([item["value"] for item in body["data"]], ["banana"])
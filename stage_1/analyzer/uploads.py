@@ -0,0 +1,85 @@
+import codecs
+import tempfile
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from .analysis import StreamingAnalysis, is_palindrome_file
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class AnalyzingSink:
+    """
+    Receives an upload as raw byte chunks: decodes them as UTF-8, feeds a
+    StreamingAnalysis and spools the bytes, in memory up to `spool_max` and
+    on disk beyond it. Nothing here grows with the upload except the spool
+    file, so memory stays bounded by the chunk size (and `spool_max`): the
+    palindrome check reads the spool back from both ends at the finish.
+    """
+
+    def __init__(self, spool_max):
+        self.analysis = StreamingAnalysis(palindrome=False)
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_max)
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def write(self, data: bytes):
+        # raises UnicodeDecodeError for bytes that are not UTF-8
+        text = self._decoder.decode(data)
+        self.analysis.update(text, encoded=data)
+        self.spool.write(data)
+        self.size += len(data)
+
+    def finish(self) -> dict:
+        """Flush the decoder and return the analysis (the same dict as analyze())."""
+        # every byte is already hashed; this only flushes (or rejects) a partial character
+        self.analysis.update(self._decoder.decode(b'', final=True), encoded=b'')
+        is_palindrome = is_palindrome_file(self.spool, self.size)
+        self.spool.seek(0)
+        return self.analysis.result(is_palindrome=is_palindrome)
+
+    def read_value(self) -> str:
+        self.spool.seek(0)
+        return self.spool.read().decode('utf-8')
+
+    def close(self):
+        self.spool.close()
+
+
+class AnalyzingUploadHandler(FileUploadHandler):
+    """
+    Multipart upload handler that feeds the `file` field into an
+    AnalyzingSink while Django parses the body, so the file is analysed in
+    the same single pass that receives it. Other files are dropped.
+    """
+    field_name = 'file'
+
+    def __init__(self, sink, chunk_size, max_size, request=None):
+        super().__init__(request)
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.too_large = False
+        self._active = False
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        # only the first `file` field is analysed
+        self._active = field_name == self.field_name and not self.sink.size
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._active:
+            if self.sink.size + len(raw_data) > self.max_size:
+                self.too_large = True
+                raise StopUpload(connection_reset=True)
+            self.sink.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self._active:
+            return None
+        return UploadedFile(self.sink.spool, name=self.file_name, content_type=self.content_type,
+                            size=file_size, charset='utf-8')
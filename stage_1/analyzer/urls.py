@@ -1,13 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     RetrieveDeleteStringView, CreateListStringsView,
-    NaturalLanguageFilterView
+    NaturalLanguageFilterView, BulkCreateStringsView, RetrieveStringByHashView,
+    MetricsView, StatsView, UploadStringView
 )
 
 urlpatterns = [
     # path('strings', CreateStringView.as_view(), name='create_string'),            # POST
     path('strings', CreateListStringsView.as_view(), name='list_strings'),             # GET (same path, DRF will route by method)
+    # fixed paths must come before the <path:string_value> catch-all below
+    path('strings/bulk', BulkCreateStringsView.as_view(), name='bulk_create_strings'),            # POST
+    path('strings/upload', UploadStringView.as_view(), name='upload_string'),                   # POST
+    path('strings/filter-by-natural-language', NaturalLanguageFilterView.as_view(), name='nl_filter'),
+    path('strings/metrics', MetricsView.as_view(), name='string_metrics'),                      # GET
+    path('strings/stats', StatsView.as_view(), name='string_stats'),                            # GET
+    path('strings/by-hash/<str:sha>', RetrieveStringByHashView.as_view(), name='get_string_by_hash'),  # GET
     path('strings/<path:string_value>', RetrieveDeleteStringView.as_view(), name='get_string'),  # GET /strings/{string_value}
     # path('strings/<path:string_value>', DeleteStringView.as_view(), name='delete_string'),  # DELETE /strings/{string_value}
-    path('strings/filter-by-natural-language', NaturalLanguageFilterView.as_view(), name='nl_filter'),
 ]
+
+if settings.ANALYZER_ASYNC_VIEWS:
+    from .async_urls import urlpatterns  # noqa: F811
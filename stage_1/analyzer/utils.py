@@ -1,8 +1,83 @@
 import re
+from functools import lru_cache
 
 class NLParseError(Exception):
     pass
 
+
+_NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+_NUM = r'(?:\d+|' + '|'.join(_NUMBER_WORDS) + r')'
+_CHARS = r'(?:characters?|chars?|letters?)'
+# An optional "the" / "a" / "an" and "letter"; a bare "a" or "an" followed by
+# another word is always the article, so "contain a vowel" is not read as 'a'.
+_LETTER = r'(?:(?:the|an?)\s+|(?!an?\s+\w))(?:letter|character|char)?\s*'
+
+
+def _num(text):
+    return int(text) if text.isdigit() else _NUMBER_WORDS[text]
+
+
+# Rule table: (name, pattern, handler). Every rule becomes one named
+# alternative of a single compiled regex, so a query is tokenized in one
+# left-to-right scan. Negated forms come before their positive forms so
+# "not palindromic" is never read as "palindromic". Groups inside a pattern
+# are prefixed with the rule name to keep them unique.
+_RULES = [
+    ('not_pal', r'\b(?:not|non)[\s-]*palindrom\w*',
+     lambda m, f: f.__setitem__('is_palindrome', False)),
+    ('pal', r'palindrom\w*',
+     lambda m, f: f.__setitem__('is_palindrome', True)),
+    ('single_word', r'\b(?:single|one)[\s-]word\b',
+     lambda m, f: f.__setitem__('word_count', 1)),
+    ('exact_words', rf'\bexactly\s+(?P<exact_words_n>{_NUM})\s+words?\b',
+     lambda m, f: f.__setitem__('word_count', _num(m['exact_words_n']))),
+    ('exact_chars', rf'\bexactly\s+(?P<exact_chars_n>{_NUM})\s+{_CHARS}',
+     lambda m, f: f.update(min_length=_num(m['exact_chars_n']), max_length=_num(m['exact_chars_n']))),
+    ('between', rf'\bbetween\s+(?P<between_lo>{_NUM})\s+and\s+(?P<between_hi>{_NUM})\b(?!\s+words?)',
+     lambda m, f: f.update(min_length=_num(m['between_lo']), max_length=_num(m['between_hi']))),
+    # "longer than 10" -> min_length = 11
+    ('longer', rf'\b(?:longer\s+than\s+(?P<longer_n>{_NUM})|more\s+than\s+(?P<more_n>{_NUM})\s+{_CHARS})',
+     lambda m, f: f.__setitem__('min_length', _num(m['longer_n'] or m['more_n']) + 1)),
+    ('shorter', rf'\b(?:shorter\s+than\s+(?P<shorter_n>{_NUM})|(?:fewer|less)\s+than\s+(?P<fewer_n>{_NUM})\s+{_CHARS})',
+     lambda m, f: f.__setitem__('max_length', max(_num(m['shorter_n'] or m['fewer_n']) - 1, 0))),
+    ('at_least', rf'\bat\s+least\s+(?P<at_least_n>{_NUM})\s+{_CHARS}',
+     lambda m, f: f.__setitem__('min_length', _num(m['at_least_n']))),
+    ('at_most', rf'\bat\s+most\s+(?P<at_most_n>{_NUM})\s+{_CHARS}',
+     lambda m, f: f.__setitem__('max_length', _num(m['at_most_n']))),
+    ('excludes', r"\b(?:not\s+contain(?:ing|s)?|(?:do|does)(?:\s+not|n't)\s+contain|without)\s+"
+                 + _LETTER + r"(?P<excludes_ch>\w)\b",
+     lambda m, f: f.__setitem__('excludes_character', m['excludes_ch'])),
+    ('contains', r'\bcontain(?:ing|s)?\s+' + _LETTER + r'(?P<contains_ch>\w)\b',
+     lambda m, f: f.__setitem__('contains_character', m['contains_ch'])),
+    # "contain the first vowel" heuristic -> 'a'
+    ('first_vowel', r'\bfirst\s+vowel\b',
+     lambda m, f: f.setdefault('contains_character', 'a')),
+]
+
+# Every rule starts at a word boundary with one of these letters; checking
+# that first lets the scan skip most positions without trying each rule.
+# Keep it in sync when adding a rule.
+_RULE_INITIALS = 'abcdeflmnopsw'
+_TOKENIZER = re.compile(
+    rf'\b(?=[{_RULE_INITIALS}])(?:'
+    + '|'.join(f'(?P<{name}>{pattern})' for name, pattern, _ in _RULES)
+    + ')'
+)
+_HANDLERS = {name: handler for name, _, handler in _RULES}
+
+
+@lru_cache(maxsize=1024)
+def _parse_normalized(query: str) -> tuple:
+    parsed = {}
+    for m in _TOKENIZER.finditer(query):
+        _HANDLERS[m.lastgroup](m, parsed)
+    # an immutable value, since lru_cache hands the same object to every caller
+    return tuple(parsed.items())
+
+
 def parse_nl_query(q: str) -> dict:
     """
     Very small heuristic parser that turns a natural-language query into filters.
@@ -11,54 +86,22 @@ def parse_nl_query(q: str) -> dict:
       - "strings longer than 10 characters" -> {"min_length": 11}
       - "palindromic strings that contain the first vowel" -> is_palindrome True and contains_character 'a' (heuristic)
       - "strings containing the letter z" -> {"contains_character": "z"}
+      - "strings containing a z" -> {"contains_character": "z"}
+      - "strings between 5 and 10 characters" -> {"min_length": 5, "max_length": 10}
+      - "strings with exactly 3 words" -> {"word_count": 3}
+      - "non-palindromic strings without the letter e" -> {"is_palindrome": False, "excludes_character": "e"}
+    Results are memoized on the normalized (lower-cased, whitespace-collapsed) query.
     Raises NLParseError if it can't produce filters.
     """
-    original = q.strip().lower()
-    if not original:
+    normalized = ' '.join(q.lower().split())
+    if not normalized:
         raise NLParseError("empty query")
 
-    parsed = {}
-    # single word
-    if re.search(r'\b(single word|one word)\b', original):
-        parsed['word_count'] = 1
-
-    # palindromic
-    if re.search(r'palindrom', original):
-        parsed['is_palindrome'] = True
-
-    # strings longer than N characters
-    m = re.search(r'longer than (\d+)', original)
-    if m:
-        n = int(m.group(1))
-        parsed['min_length'] = n + 1  # "longer than 10" -> min_length = 11
-
-    # strings shorter than N characters
-    m2 = re.search(r'shorter than (\d+)', original)
-    if m2:
-        n = int(m2.group(1))
-        parsed['max_length'] = n - 1 if n > 0 else 0
-
-    # containing the letter X or containing the letter 'z'
-    m3 = re.search(r'containing the letter (\w)', original)
-    if m3:
-        parsed['contains_character'] = m3.group(1)
-
-    m4 = re.search(r'contain the letter (\w)', original)
-    if m4:
-        parsed['contains_character'] = m4.group(1)
-
-    # "contain the first vowel" heuristic -> 'a'
-    if 'first vowel' in original:
-        parsed['contains_character'] = parsed.get('contains_character', 'a')
-
-    # "strings containing the letter z" exact phrase
-    if re.search(r'\bcontaining.*z\b', original):
-        parsed['contains_character'] = 'z'
-
+    parsed = _parse_normalized(normalized)
     if not parsed:
         raise NLParseError("unable to parse natural language query")
 
     return {
         "original": q,
-        "parsed_filters": parsed
+        "parsed_filters": dict(parsed)
     }
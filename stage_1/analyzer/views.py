@@ -2,18 +2,37 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import ListCreateAPIView, RetrieveDestroyAPIView
-from django.shortcuts import get_object_or_404
-from .models import AnalyzedString
+from rest_framework.settings import api_settings
+from .models import AnalyzedString, StringStat, bulk_create_strings
 from .serializers import AnalyzeStringSerializer
 from .utils import parse_nl_query, NLParseError
-from django.db import IntegrityError
+from .analysis import sha256_hex
+from .cache import query_cache, representation_cache
+from .offload import analysis_pool
+from .pagination import InvalidCursor, apply_keyset, paginate
+from .renderers import NDJSONRenderer, stream_ndjson
+from .filters import (
+    check_conflicts, compile_filters, format_rows, iter_formatted, parse_fields, parse_limit, parse_list_filters, project,
+)
+from .stats import summarize
+from .uploads import AnalyzingSink, AnalyzingUploadHandler, UploadTooLarge
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.http.multipartparser import MultiPartParser, MultiPartParserError
+import json
 
 class CreateListStringsView(ListCreateAPIView):
     """
     POST /strings
+    GET /strings?is_palindrome=&min_length=&max_length=&word_count=&contains_character=
+                &limit=&cursor=&format=ndjson&fields=value,length,...
     """
     serializer_class = AnalyzeStringSerializer
     queryset = AnalyzedString.objects.all()
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    max_page_size = 1000
+    chunk_size = 500  # rows fetched per round-trip when iterating a full listing
 
     def post(self, request, *args, **kwargs):
         data = request.data
@@ -22,12 +41,11 @@ class CreateListStringsView(ListCreateAPIView):
         if not isinstance(data['value'], str):
             return Response({"detail": '"value" must be a string'}, status=422)
         value = data['value']
-        import hashlib
-        sha = hashlib.sha256(value.encode('utf-8')).hexdigest()
+        sha = sha256_hex(value)
         if AnalyzedString.objects.filter(id=sha).exists():
             return Response({"detail": "String already exists"}, status=status.HTTP_409_CONFLICT)
-        # post
-        instance = AnalyzedString(value=value)
+        # post (save() reuses the hash instead of computing it again)
+        instance = AnalyzedString(value=value, sha256_hash=sha)
         try:
             instance.save()
         except IntegrityError:
@@ -39,63 +57,210 @@ class CreateListStringsView(ListCreateAPIView):
     def get(self, request, *args, **kwargs):
         qs = self.filter_queryset(self.get_queryset())
 
-        # apply query params
-        is_pal = request.query_params.get('is_palindrome')
-        min_length = request.query_params.get('min_length')
-        max_length = request.query_params.get('max_length')
-        word_count = request.query_params.get('word_count')
-        contains_character = request.query_params.get('contains_character')
+        try:
+            filters_applied = parse_list_filters(request.query_params)
+            fields = parse_fields(request.query_params.get('fields'))
+            # keyset pagination: ?limit=N[&cursor=...]; without limit every match is returned
+            limit = parse_limit(request.query_params.get('limit'), self.max_page_size)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        qs = project(compile_filters(filters_applied, qs), fields)
 
-        filters_applied = {}
+        cursor = request.query_params.get('cursor')
+        # ?format=ndjson / Accept: application/x-ndjson streams rows as they are read
+        streaming = request.accepted_renderer.format == NDJSONRenderer.format
 
-        if is_pal is not None:
-            if is_pal.lower() not in ('true', 'false'):
-                return Response({"detail": "is_palindrome must be true or false"}, status=400)
-            filters_applied['is_palindrome'] = is_pal.lower() == 'true'
-            qs = qs.filter(is_palindrome=filters_applied['is_palindrome'])
+        if not streaming:
+            cache_params = {"filters": filters_applied, "limit": limit, "cursor": cursor, "fields": fields}
+            cached, generation = query_cache.get('list', cache_params)
+            if cached is not None:
+                return self._list_response(cached, filters_applied, limit, 'HIT')
 
-        if min_length is not None:
-            try:
-                ml = int(min_length)
-            except ValueError:
-                return Response({"detail": "min_length must be integer"}, status=400)
-            filters_applied['min_length'] = ml
-            qs = qs.filter(length__gte=ml)
+        next_cursor = None
+        try:
+            if limit is not None:
+                rows, next_cursor = paginate(qs, limit, cursor)
+            else:
+                rows = apply_keyset(qs, cursor).iterator(chunk_size=self.chunk_size)
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=400)
+
+        if streaming:
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+            return stream_ndjson(iter_formatted(rows, fields, self.chunk_size), headers=headers)
+
+        result = {"data": format_rows(rows, fields), "next_cursor": next_cursor}
+        query_cache.set('list', cache_params, generation, result, rows=len(result["data"]))
+        return self._list_response(result, filters_applied, limit, 'MISS')
+
+    @staticmethod
+    def _list_response(result, filters_applied, limit, cache_status):
+        body = {
+            "data": result["data"],
+            "count": len(result["data"]),
+            "filters_applied": filters_applied
+        }
+        if limit is not None:
+            body["next_cursor"] = result["next_cursor"]
+        return Response(body, status=200, headers={"X-Cache": cache_status})
+
+class BulkCreateStringsView(APIView):
+    """
+    POST /strings/bulk
+
+    Body is either a JSON array or NDJSON (Content-Type: application/x-ndjson),
+    one item per element/line. An item is a string or {"value": "..."}.
+    Items are analyzed and inserted in batches with bulk_create, so loading a
+    corpus costs one existence query and one insert per batch instead of per
+    string. Returns a status per item: created, conflict or invalid.
+    """
+    batch_size = 1000
+    ndjson_types = ('application/x-ndjson', 'application/ndjson')
+
+    def post(self, request, *args, **kwargs):
+        if request.content_type.split(';')[0].strip() in self.ndjson_types:
+            items = self._iter_ndjson(request.stream)
+        else:
+            if not isinstance(request.data, list):
+                return Response({"detail": "Body must be a JSON array or NDJSON"}, status=status.HTTP_400_BAD_REQUEST)
+            items = iter(request.data)
+
+        results = []
+        seen = set()
+        batch = []
+        for index, item in enumerate(items):
+            value = item.get('value') if isinstance(item, dict) else item
+            if not isinstance(value, str):
+                results.append({"index": index, "status": "invalid", "detail": '"value" must be a string'})
+                continue
+            batch.append((index, value))
+            if len(batch) >= self.batch_size:
+                results.extend(self._insert_batch(batch, seen))
+                batch = []
+        if batch:
+            results.extend(self._insert_batch(batch, seen))
 
-        if max_length is not None:
+        results.sort(key=lambda r: r["index"])
+        summary = {name: 0 for name in ("created", "conflict", "invalid")}
+        for r in results:
+            summary[r["status"]] += 1
+        return Response({
+            "results": results,
+            "summary": summary,
+        }, status=status.HTTP_201_CREATED if summary["created"] else status.HTTP_200_OK)
+
+    @staticmethod
+    def _iter_ndjson(stream):
+        for line in stream or ():
+            line = line.strip()
+            if not line:
+                continue
             try:
-                mx = int(max_length)
+                yield json.loads(line)
             except ValueError:
-                return Response({"detail": "max_length must be integer"}, status=400)
-            filters_applied['max_length'] = mx
-            qs = qs.filter(length__lte=mx)
+                yield None  # reported as invalid at its index
+
+    def _insert_batch(self, batch, seen):
+        hashed = [(index, value, sha256_hex(value)) for index, value in batch]
+        existing = set(
+            AnalyzedString.objects.filter(id__in=[sha for _, _, sha in hashed]).values_list('id', flat=True)
+        )
+
+        results = []
+        to_create = []
+        for index, value, sha in hashed:
+            if sha in existing or sha in seen:
+                results.append({"index": index, "id": sha, "status": "conflict"})
+                continue
+            seen.add(sha)
+            # bulk_create skips save(), so fill in the analysed fields here
+            to_create.append(AnalyzedString(value=value, **analysis_pool.analyze(value, sha256=sha)))
+            results.append({"index": index, "id": sha, "status": None})
+
+        with transaction.atomic():
+            # rows inserted concurrently since the lookup above are skipped,
+            # and reported as conflicts
+            inserted = bulk_create_strings(to_create, batch_size=self.batch_size)
+        for result in results:
+            if result["status"] is None:
+                result["status"] = "created" if result["id"] in inserted else "conflict"
+        return results
 
-        if word_count is not None:
+class UploadStringView(APIView):
+    """
+    POST /strings/upload
+
+    The body is the text itself (any non-multipart Content-Type) or a
+    multipart form with a `file` field, UTF-8 encoded. It is analysed
+    ANALYZER_UPLOAD_CHUNK_SIZE bytes at a time as it is read, so the body is
+    never held in memory as a whole. Values over ANALYZER_UPLOAD_INLINE_MAX
+    bytes are stored as a file (value_file) instead of in the value column;
+    their representation has "value": null and a "value_url".
+    """
+    def post(self, request, *args, **kwargs):
+        max_size = settings.ANALYZER_MAX_UPLOAD_SIZE
+        sink = AnalyzingSink(spool_max=settings.ANALYZER_UPLOAD_INLINE_MAX)
+        try:
             try:
-                wc = int(word_count)
-            except ValueError:
-                return Response({"detail": "word_count must be integer"}, status=400)
-            filters_applied['word_count'] = wc
-            qs = qs.filter(word_count=wc)
-
-        if contains_character is not None:
-            if len(contains_character) != 1:
-                return Response({"detail": "contains_character must be a single character"}, status=400)
-            filters_applied['contains_character'] = contains_character
-            qs = qs.filter(character_frequency_map__has_key=contains_character)  # Postgres JSONField helper
-            # If not Postgres, fallback:
-            # qs = qs.filter(character_frequency_map__contains={contains_character: 1})  # approximate
-
-        data = [o.to_representation() for o in qs]
-        return Response({
-            "data": data,
-            "count": len(data),
-            "filters_applied": filters_applied
-        }, status=200)
+                if request.content_type.startswith('multipart/form-data'):
+                    handler = AnalyzingUploadHandler(sink, settings.ANALYZER_UPLOAD_CHUNK_SIZE, max_size)
+                    _, files = MultiPartParser(request.META, request.stream, [handler], request.encoding).parse()
+                    if handler.too_large:
+                        raise UploadTooLarge()
+                    if 'file' not in files:
+                        return Response({"detail": 'Missing "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+                else:
+                    self._read_raw(request.stream, sink, max_size)
+                props = sink.finish()
+            except UnicodeDecodeError:
+                return Response({"detail": "Upload must be UTF-8 text"}, status=422)
+            except MultiPartParserError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except UploadTooLarge:
+                return Response({"detail": f"Upload exceeds {max_size} bytes"},
+                                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            return self._create(sink, props)
+        finally:
+            sink.close()
+
+    @staticmethod
+    def _read_raw(stream, sink, max_size):
+        chunk_size = settings.ANALYZER_UPLOAD_CHUNK_SIZE
+        while stream is not None:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            if sink.size + len(chunk) > max_size:
+                raise UploadTooLarge()
+            sink.write(chunk)
+
+    @staticmethod
+    def _create(sink, props):
+        sha = props["id"]
+        if AnalyzedString.objects.filter(id=sha).exists():
+            return Response({"detail": "String already exists"}, status=status.HTTP_409_CONFLICT)
+        # analysed already, so save() does not analyse the value again
+        instance = AnalyzedString(**props)
+        if sink.size <= settings.ANALYZER_UPLOAD_INLINE_MAX:
+            instance.value = sink.read_value()
+        else:
+            instance.value_file.save(f'{sha}.txt', File(sink.spool), save=False)
+        try:
+            instance.save()
+        except IntegrityError:
+            if instance.value_file:
+                instance.value_file.delete(save=False)
+            return Response({"detail": "String already exists"}, status=status.HTTP_409_CONFLICT)
+        return Response(instance.to_representation(), status=status.HTTP_201_CREATED)
+
 
 class RetrieveDeleteStringView(RetrieveDestroyAPIView):
     """
     GET /strings/{string_value}
+    DELETE /strings/{string_value}
+
+    The value is hashed and looked up by its sha256 primary key rather than
+    compared against the unbounded value column.
     """
     serializer_class = AnalyzeStringSerializer
     queryset = AnalyzedString.objects.all()
@@ -103,24 +268,47 @@ class RetrieveDeleteStringView(RetrieveDestroyAPIView):
     lookup_url_kwarg = 'string_value'
 
     def retrieve(self, request, *args, **kwargs):
-        # lookup by raw value (URL-encoded in client)
+        # lookup by raw value (URL-encoded in client), via its sha256 primary key
         value = kwargs.get(self.lookup_url_kwarg)
         if value is None:
             return Response({"detail": "string_value missing in URL"}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            obj = get_object_or_404(AnalyzedString, value=value)
-        except Exception:
+        representation = get_representation(sha256_hex(value))
+        if representation is None:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
-        return Response(obj.to_representation(), status=status.HTTP_200_OK)
+        return Response(representation, status=status.HTTP_200_OK)
     
     def delete(self, request, *args, **kwargs):
         value = kwargs.get(self.lookup_url_kwarg)
-        obj = AnalyzedString.objects.filter(value=value).first()
-        if not obj:
+        # post_delete drops the cached representation
+        deleted, _ = AnalyzedString.objects.filter(id=sha256_hex(value)).delete()
+        if not deleted:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
-        obj.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class RetrieveStringByHashView(APIView):
+    """
+    GET /strings/by-hash/{sha256}
+    """
+    def get(self, request, sha, *args, **kwargs):
+        representation = get_representation(sha.lower())
+        if representation is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(representation, status=status.HTTP_200_OK)
+
+
+def get_representation(sha):
+    """Representation of the string with this sha256, from the LRU or the primary key."""
+    representation = representation_cache.get(sha)
+    if representation is None:
+        # taken before the read: a delete committing meanwhile voids the set() below
+        epoch = representation_cache.epoch()
+        obj = AnalyzedString.objects.filter(id=sha).first()
+        if obj is None:
+            return None
+        representation = obj.to_representation()
+        representation_cache.set(sha, representation, epoch)
+    return representation
+
 # class DeleteStringView(generics.DestroyAPIView):
 #     """
 #     DELETE /strings/{string_value}
@@ -205,7 +393,7 @@ class RetrieveDeleteStringView(RetrieveDestroyAPIView):
 
 class NaturalLanguageFilterView(APIView):
     """
-    GET /strings/filter-by-natural-language?query=...
+    GET /strings/filter-by-natural-language?query=...&fields=...
     """
     def get(self, request, *args, **kwargs):
         q = request.query_params.get('query')
@@ -217,30 +405,52 @@ class NaturalLanguageFilterView(APIView):
             return Response({"detail": str(e)}, status=400)
         parsed_filters = parsed['parsed_filters']
 
-        # convert parsed_filters to DB filters
-        qs = AnalyzedString.objects.all()
-        # simple conflict detection: e.g., parsed has min_length > max_length if both present
-        if 'min_length' in parsed_filters and 'max_length' in parsed_filters:
-            if parsed_filters['min_length'] > parsed_filters['max_length']:
-                return Response({"detail": "Conflicting filters in parsed query"}, status=422)
-
-        if parsed_filters.get('is_palindrome') is True:
-            qs = qs.filter(is_palindrome=True)
-        if parsed_filters.get('word_count') is not None:
-            qs = qs.filter(word_count=parsed_filters['word_count'])
-        if parsed_filters.get('min_length') is not None:
-            qs = qs.filter(length__gte=parsed_filters['min_length'])
-        if parsed_filters.get('max_length') is not None:
-            qs = qs.filter(length__lte=parsed_filters['max_length'])
-        if parsed_filters.get('contains_character') is not None:
-            ch = parsed_filters['contains_character']
-            if len(ch) != 1:
-                return Response({"detail": "parsed contains_character not single char"}, status=422)
-            qs = qs.filter(character_frequency_map__has_key=ch)
-
-        data = [o.to_representation() for o in qs]
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        try:
+            check_conflicts(parsed_filters)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=422)
+
+        # identical parsed filters share one cached result, whatever the wording
+        cache_params = {"filters": parsed_filters, "fields": fields}
+        cached, generation = query_cache.get('nl', cache_params)
+        if cached is not None:
+            return Response({
+                "data": cached,
+                "count": len(cached),
+                "interpreted_query": parsed
+            }, status=200, headers={"X-Cache": "HIT"})
+
+        data = format_rows(project(compile_filters(parsed_filters), fields), fields)
+        query_cache.set('nl', cache_params, generation, data, rows=len(data))
         return Response({
             "data": data,
             "count": len(data),
             "interpreted_query": parsed
-        }, status=200)
+        }, status=200, headers={"X-Cache": "MISS"})
+
+
+class MetricsView(APIView):
+    """
+    GET /strings/metrics — hit rates of this process's caches and the analysis pool's queue.
+    """
+    def get(self, request, *args, **kwargs):
+        return Response({
+            "query_cache": query_cache.stats(),
+            "representation_cache": representation_cache.stats(),
+            "analysis_pool": analysis_pool.stats(),
+        })
+
+
+class StatsView(APIView):
+    """
+    GET /strings/stats — totals, palindrome counts, length histogram, word count
+    distribution and character frequencies over every stored string. Reads the
+    StringStat counters (one small query), never the strings themselves.
+    """
+    def get(self, request, *args, **kwargs):
+        return Response(summarize(StringStat.objects.values_list('kind', 'key', 'count')))
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: per-character dict loop + re (the old AnalyzedString.save)
+against analyzer.analysis.analyze on large strings.
+
+    cd stage_1
+    python -m benchmarks.analysis --size 1000000 --repeat 5
+"""
+import argparse
+import hashlib
+import random
+import re
+import string
+import timeit
+
+from analyzer.analysis import analyze, sha256_hex
+
+
+def legacy_analyze(value):
+    # what AnalyzedString.save did before, including the view's extra hash
+    hashlib.sha256(value.encode('utf-8')).hexdigest()
+    sha = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    freq = {}
+    for ch in value:
+        freq[ch] = freq.get(ch, 0) + 1
+    cleaned = re.sub(r'[^0-9a-zA-Z]', '', value).lower()
+    return {
+        "id": sha,
+        "sha256_hash": sha,
+        "length": len(value),
+        "is_palindrome": cleaned == cleaned[::-1],
+        "unique_characters": len(set(value)),
+        "word_count": len(value.split()),
+        "character_frequency_map": freq,
+    }
+
+
+def current_analyze(value):
+    return analyze(value, sha256=sha256_hex(value))
+
+
+def corpus(size):
+    rng = random.Random(1)
+    alphabet = string.ascii_letters + string.digits + "     .,!?éß漢"
+    text = "".join(rng.choices(alphabet, k=size // 2))
+    return {
+        "mixed text": text + text[::-1],  # palindromic, so the full comparison runs
+        "ascii letters": "".join(rng.choices(string.ascii_lowercase, k=size)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'input':<15} {'legacy ms':>10} {'analyze ms':>11} {'speedup':>8}")
+    for name, value in corpus(args.size).items():
+        assert legacy_analyze(value) == current_analyze(value)
+        legacy = min(timeit.repeat(lambda: legacy_analyze(value), number=1, repeat=args.repeat))
+        current = min(timeit.repeat(lambda: current_analyze(value), number=1, repeat=args.repeat))
+        print(f"{name:<15} {legacy * 1000:>10.1f} {current * 1000:>11.1f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
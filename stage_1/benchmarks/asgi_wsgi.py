@@ -0,0 +1,138 @@
+"""
+Throughput of the string endpoints under WSGI (gunicorn, DRF views) against
+ASGI (uvicorn, the async views), at 200 concurrent clients.
+
+Both servers run one worker process against the same seeded SQLite file in a
+temporary directory, with the query and representation caches turned off so
+every request reaches the ORM. Needs gunicorn and uvicorn (requirements.txt).
+
+    cd stage_1
+    python -m benchmarks.asgi_wsgi -n 4000 -c 200
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROWS = 2000
+PATHS = (
+    "/strings?limit=20",
+    "/strings?min_length=20&max_length=30&limit=20",
+    "/strings/benchmark string 1001",
+    "/strings/filter-by-natural-language?query=strings+containing+the+letter+q",  # every 100th row
+
+)
+
+BENCH_SETTINGS = """\
+from stage_1.settings import *  # noqa: F401,F403
+
+DATABASES = {{'default': {{'ENGINE': 'django.db.backends.sqlite3', 'NAME': {db!r}}}}}
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+ANALYZER_QUERY_CACHE_MAX_ROWS = -1
+ANALYZER_REPRESENTATION_CACHE_SIZE = 0
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare(workdir):
+    db = str(Path(workdir) / "bench.sqlite3")
+    (Path(workdir) / "bench_settings.py").write_text(BENCH_SETTINGS.format(db=db))
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([workdir, os.getcwd()]),
+        "DJANGO_SETTINGS_MODULE": "bench_settings",
+    }
+    seed = (
+        "import django; django.setup()\n"
+        "from django.core.management import call_command\n"
+        "call_command('migrate', verbosity=0)\n"
+        "from analyzer.analysis import analyze\n"
+        "from analyzer.models import AnalyzedString, bulk_create_strings\n"
+        f"values = [f'benchmark string {{i}}' + ' x' * (i % 7) + ' q' * (i % 100 == 0) for i in range({ROWS})]\n"
+        "bulk_create_strings([AnalyzedString(value=v, **analyze(v)) for v in values])\n"
+    )
+    subprocess.run([sys.executable, "-c", seed], env=env, check=True)
+    return env
+
+
+def start_server(kind, port, env, threads):
+    if kind == "wsgi":
+        cmd = ["gunicorn", "stage_1.wsgi:application", "-b", f"127.0.0.1:{port}",
+               "-w", "1", "-k", "gthread", "--threads", str(threads),
+               "--keep-alive", "60", "--log-level", "warning"]
+    else:
+        cmd = ["uvicorn", "stage_1.asgi:application", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", "1", "--timeout-keep-alive", "60", "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, env=env)
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/strings?limit=1", timeout=1)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+async def load(base_url, path, total, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+
+        await asyncio.gather(*(one() for _ in range(min(total, 200))))  # warm up
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return total / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--requests", type=int, default=4000, help="requests per path")
+    parser.add_argument("-c", "--concurrency", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32, help="gunicorn gthread threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = prepare(workdir)
+        print(f"{'server':<6} {'path':<72} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for kind in ("wsgi", "asgi"):
+            port = free_port()
+            proc = start_server(kind, port, env, args.threads)
+            try:
+                for path in PATHS:
+                    rps, p50, p99 = asyncio.run(load(f"http://127.0.0.1:{port}", path,
+                                                     args.requests, args.concurrency))
+                    print(f"{kind:<6} {path:<72} {rps:>8.0f} {p50:>8.1f} {p99:>8.1f}")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Ingestion rate: one POST /strings per value against POST /strings/bulk.
+
+    cd stage_1
+    python -m benchmarks.bulk_ingest --count 5000
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from benchmarks.django_setup import setup
+
+
+def make_values(count, prefix):
+    rng = random.Random(prefix)
+    return [f"{prefix}-{i} " + "".join(rng.choices(string.ascii_lowercase + " ", k=40)) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client
+    client = Client()
+
+    values = make_values(args.count, "single")
+    start = time.perf_counter()
+    for value in values:
+        response = client.post('/strings', {"value": value}, content_type='application/json')
+        assert response.status_code == 201, response.content
+    single = args.count / (time.perf_counter() - start)
+
+    values = make_values(args.count, "json")
+    start = time.perf_counter()
+    response = client.post('/strings/bulk', values, content_type='application/json')
+    assert response.json()["summary"]["created"] == args.count
+    bulk_json = args.count / (time.perf_counter() - start)
+
+    values = make_values(args.count, "ndjson")
+    body = "\n".join(json.dumps(v) for v in values)
+    start = time.perf_counter()
+    response = client.post('/strings/bulk', body, content_type='application/x-ndjson')
+    assert response.json()["summary"]["created"] == args.count
+    bulk_ndjson = args.count / (time.perf_counter() - start)
+
+    print(f"{'mode':<22} {'strings/s':>10} {'vs single':>10}")
+    for name, rate in (("POST /strings", single), ("bulk (JSON array)", bulk_json), ("bulk (NDJSON)", bulk_ndjson)):
+        print(f"{name:<22} {rate:>10.0f} {rate / single:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
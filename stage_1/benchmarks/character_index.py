@@ -0,0 +1,72 @@
+"""
+contains_character lookup time as the table grows: the StringCharacter join
+against the old JSON has_key filter. The number of matching rows is held
+fixed, so an indexed lookup should stay flat while has_key grows with the
+table.
+
+    cd stage_1
+    python -m benchmarks.character_index --sizes 10000,50000,200000
+"""
+import argparse
+import random
+import string
+import time
+
+from benchmarks.django_setup import setup
+
+MATCHES = 100
+NEEDLE = "q"
+
+
+def seed(upto, start):
+    from analyzer.analysis import analyze
+    from analyzer.models import AnalyzedString, bulk_create_strings
+
+    rng = random.Random(start)
+    alphabet = string.ascii_lowercase.replace(NEEDLE, "") + " "
+    batch = []
+    for i in range(start, upto):
+        value = f"{i} " + "".join(rng.choices(alphabet, k=30))
+        batch.append(AnalyzedString(value=value, **analyze(value)))
+        if len(batch) == 5000:
+            bulk_create_strings(batch)
+            batch = []
+    bulk_create_strings(batch)
+
+
+def best_of(qs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(qs.values_list('id', flat=True))
+        best = min(best, time.perf_counter() - start)
+    assert count == MATCHES, count
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,50000,200000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from analyzer.analysis import analyze
+    from analyzer.models import AnalyzedString, bulk_create_strings
+
+    needles = [f"needle {i} {NEEDLE}" for i in range(MATCHES)]
+    bulk_create_strings([AnalyzedString(value=v, **analyze(v)) for v in needles])
+
+    print(f"{'rows':>8} {'json has_key ms':>16} {'indexed join ms':>16}")
+    seeded = 0
+    for size in (int(x) for x in args.sizes.split(",")):
+        seed(size, seeded)
+        seeded = size
+        qs = AnalyzedString.objects.all()
+        json_scan = best_of(qs.filter(character_frequency_map__has_key=NEEDLE), args.repeat)
+        indexed = best_of(qs.filter(characters__char=NEEDLE), args.repeat)
+        print(f"{size + MATCHES:>8} {json_scan * 1000:>16.1f} {indexed * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
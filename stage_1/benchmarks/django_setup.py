@@ -0,0 +1,14 @@
+"""
+Boot Django for a benchmark script against a throwaway test database, so the
+benchmarks never touch db.sqlite3.
+"""
+import os
+
+
+def setup(verbosity=0):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stage_1.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
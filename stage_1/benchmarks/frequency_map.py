@@ -0,0 +1,78 @@
+"""
+character_frequency_map stored as JSON against the packed encoding of
+analyzer/frequency.py: bytes per map and per-map decode time for a few
+kinds of text, then the full-field list projection over --rows strings
+stored each way.
+
+    cd stage_1
+    python -m benchmarks.frequency_map --rows 20000
+"""
+import argparse
+import json
+import random
+import string
+import time
+from collections import Counter
+
+from benchmarks.django_setup import setup
+
+
+def best_of(fn, repeat, number=1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def samples():
+    rng = random.Random(7)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(500)]
+    prose = " ".join(rng.choices(words, k=20000)).capitalize() + "."
+    return {
+        "short word": "level",
+        "sentence": "the quick brown fox jumps over the lazy dog",
+        "ascii prose 2KB": prose[:2048],
+        "ascii prose 200KB": prose[:200_000],
+        "mixed unicode 2KB": "".join(rng.choices(string.ascii_letters + "éüßçøåλπσ😀中文字", k=2048)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from analyzer.analysis import analyze
+    from analyzer.filters import REPRESENTATION_FIELDS, format_rows, project
+    from analyzer.frequency import pack_frequency_map, unpack_frequency_map
+    from analyzer.models import AnalyzedString, bulk_create_strings
+
+    print(f"{'text':<20} {'JSON B':>7} {'packed B':>9} {'JSON us':>8} {'packed us':>10}")
+    for name, text in samples().items():
+        freq = dict(Counter(text))
+        as_json = json.dumps(freq)  # what JSONField writes
+        packed = pack_frequency_map(freq)
+        json_us = best_of(lambda: json.loads(as_json), args.repeat, 2000) * 1e6
+        packed_us = best_of(lambda: unpack_frequency_map(packed), args.repeat, 2000) * 1e6
+        print(f"{name:<20} {len(as_json.encode()):>7} {len(packed):>9} {json_us:>8.2f} {packed_us:>10.2f}")
+
+    print(f"\n{'list projection':<20} {'ms':>7}")
+    for compact in (False, True):
+        settings.ANALYZER_COMPACT_FREQUENCY_MAP = compact
+        AnalyzedString.objects.all().delete()
+        values = [f"frequency benchmark {i} {'with some more words ' * (i % 4)}" for i in range(args.rows)]
+        bulk_create_strings([AnalyzedString(value=v, **analyze(v)) for v in values], batch_size=5000)
+        qs = AnalyzedString.objects
+        ms = best_of(lambda: format_rows(project(qs.all(), REPRESENTATION_FIELDS), REPRESENTATION_FIELDS),
+                     args.repeat) * 1000
+        print(f"{'packed' if compact else 'JSON':<20} {ms:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Query times for the list / natural-language filters on a large seeded table,
+with the analyzer indexes in place and again after dropping them.
+
+    cd stage_1
+    python -m benchmarks.indexes --rows 1000000
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.django_setup import setup
+
+
+def seed(rows):
+    from django.utils import timezone
+    from analyzer.models import AnalyzedString
+
+    rng = random.Random(0)
+    now = timezone.now()
+    batch = []
+    for i in range(rows):
+        length = rng.randint(1, 200)
+        # synthetic rows: only the filtered columns need realistic spreads
+        batch.append(AnalyzedString(
+            id=f"{i:064x}", value=f"v{i}", length=length, is_palindrome=rng.random() < 0.05,
+            unique_characters=min(length, 26), word_count=rng.randint(1, 30),
+            sha256_hash=f"{i:064x}", character_frequency_map={},
+            created_at=now - timedelta(seconds=i),
+        ))
+        if len(batch) == 20000:
+            AnalyzedString.objects.bulk_create(batch)
+            batch = []
+    AnalyzedString.objects.bulk_create(batch)
+
+
+def queries():
+    from analyzer.models import AnalyzedString
+    from analyzer.pagination import apply_keyset
+
+    qs = AnalyzedString.objects.all()
+    return {
+        "newest 100": apply_keyset(qs)[:100],
+        "palindromes, newest 100": apply_keyset(qs.filter(is_palindrome=True))[:100],
+        "word_count=1": qs.filter(word_count=1),
+        "word_count=1, length>=150": qs.filter(word_count=1, length__gte=150),
+        "length 10..12": qs.filter(length__gte=10, length__lte=12),
+        "single word palindromes": qs.filter(is_palindrome=True, word_count=1),
+    }
+
+
+def time_queries(repeat):
+    timings = {}
+    for name, qs in queries().items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(qs.values_list('id', flat=True))
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from analyzer.models import AnalyzedString
+
+    seed(args.rows)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    with_indexes = time_queries(args.repeat)
+
+    with connection.schema_editor() as editor:
+        for index in AnalyzedString._meta.indexes:
+            editor.remove_index(AnalyzedString, index)
+    without_indexes = time_queries(args.repeat)
+
+    print(f"{args.rows} rows\n")
+    print(f"{'query':<28} {'no index ms':>12} {'indexed ms':>11} {'speedup':>8}")
+    for name, indexed in with_indexes.items():
+        plain = without_indexes[name]
+        print(f"{name:<28} {plain * 1000:>12.1f} {indexed * 1000:>11.1f} {plain / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
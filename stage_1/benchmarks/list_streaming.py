@@ -0,0 +1,68 @@
+"""
+Peak Python memory of GET /strings as the table grows: the full JSON listing
+against the NDJSON stream and a keyset page.
+
+    cd stage_1
+    python -m benchmarks.list_streaming --sizes 1000,10000,50000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.django_setup import setup
+
+
+def seed(upto, start):
+    from analyzer.analysis import analyze
+    from analyzer.models import AnalyzedString
+
+    rows = []
+    for i in range(start, upto):
+        value = f"benchmark string number {i} with a few words"
+        rows.append(AnalyzedString(value=value, **analyze(value)))
+        if len(rows) == 5000:
+            AnalyzedString.objects.bulk_create(rows)
+            rows = []
+    AnalyzedString.objects.bulk_create(rows)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client
+    client = Client()
+
+    def full_json():
+        client.get('/strings').content
+
+    def ndjson():
+        for _ in client.get('/strings', {"format": "ndjson"}).streaming_content:
+            pass
+
+    def page():
+        client.get('/strings', {"limit": 100}).content
+
+    print(f"{'rows':>8} {'json MiB':>9} {'ndjson MiB':>11} {'page MiB':>9} {'json s':>7} {'ndjson s':>9} {'page s':>7}")
+    seeded = 0
+    for size in (int(x) for x in args.sizes.split(",")):
+        seed(size, seeded)
+        seeded = size
+        (jm, js), (nm, ns), (pm, ps) = measure(full_json), measure(ndjson), measure(page)
+        print(f"{size:>8} {jm:>9.1f} {nm:>11.1f} {pm:>9.1f} {js:>7.2f} {ns:>9.2f} {ps:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Parses per second for the natural-language query parser: the original
+re.search-per-heuristic version, the compiled single-pass tokenizer with the
+memo bypassed (cold), and with the memo warm.
+
+    cd stage_1
+    python -m benchmarks.nl_parser --rounds 2000
+"""
+import argparse
+import re
+import time
+
+from analyzer import utils
+from analyzer.utils import NLParseError, parse_nl_query
+
+# Queries as dashboards and clients actually send them.
+QUERIES = [
+    "all single word palindromic strings",
+    "strings longer than 10 characters",
+    "palindromic strings that contain the first vowel",
+    "strings containing the letter z",
+    "strings shorter than 5 characters",
+    "single word strings containing the letter a",
+    "palindromic strings longer than 3 characters",
+    "strings containing the letter e",
+    "one word palindromes",
+    "strings longer than 20 characters containing the letter q",
+    "All Single Word Palindromic Strings",
+    "palindromic strings shorter than 8 characters",
+]
+
+
+def legacy_parse(q):
+    # analyzer.utils.parse_nl_query before the rule table
+    original = q.strip().lower()
+    parsed = {}
+    if re.search(r'\b(single word|one word)\b', original):
+        parsed['word_count'] = 1
+    if re.search(r'palindrom', original):
+        parsed['is_palindrome'] = True
+    m = re.search(r'longer than (\d+)', original)
+    if m:
+        parsed['min_length'] = int(m.group(1)) + 1
+    m2 = re.search(r'shorter than (\d+)', original)
+    if m2:
+        n = int(m2.group(1))
+        parsed['max_length'] = n - 1 if n > 0 else 0
+    m3 = re.search(r'containing the letter (\w)', original)
+    if m3:
+        parsed['contains_character'] = m3.group(1)
+    m4 = re.search(r'contain the letter (\w)', original)
+    if m4:
+        parsed['contains_character'] = m4.group(1)
+    if 'first vowel' in original:
+        parsed['contains_character'] = parsed.get('contains_character', 'a')
+    if re.search(r'\bcontaining.*z\b', original):
+        parsed['contains_character'] = 'z'
+    if not parsed:
+        raise NLParseError("unable to parse natural language query")
+    return {"original": q, "parsed_filters": parsed}
+
+
+def rate(parse, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q in QUERIES:
+            parse(q)
+    return rounds * len(QUERIES) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    for q in QUERIES:
+        assert legacy_parse(q)["parsed_filters"] == parse_nl_query(q)["parsed_filters"], q
+
+    legacy = rate(legacy_parse, args.rounds)
+    memoized = utils._parse_normalized
+    utils._parse_normalized = memoized.__wrapped__
+    try:
+        cold = rate(parse_nl_query, args.rounds)
+    finally:
+        utils._parse_normalized = memoized
+    warm = rate(parse_nl_query, args.rounds)
+    print(f"{'parser':<26} {'parses/s':>10} {'vs legacy':>10}")
+    for name, value in (("legacy (re.search x9)", legacy), ("rule table, no memo", cold),
+                        ("rule table, memo warm", warm)):
+        print(f"{name:<26} {value:>10.0f} {value / legacy:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+What analysing one huge string does to the other threads of a worker:
+inline analyze() against the process pool. A sibling thread keeps analysing
+small strings (standing in for other requests) and reports how many it
+finished and its worst latency while the big one ran.
+
+    cd stage_1
+    python -m benchmarks.offload --mib 50
+"""
+import argparse
+import os
+import random
+import threading
+import time
+
+
+def sibling(stop, latencies):
+    from analyzer.analysis import analyze
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        time.sleep(0.001)  # other requests arrive, they do not spin
+        analyze("a small request body with a few words")
+        # includes waiting for the GIL after the sleep
+        latencies.append(time.perf_counter() - start)
+
+
+def run(label, fn, value):
+    stop = threading.Event()
+    latencies = []
+    thread = threading.Thread(target=sibling, args=(stop, latencies))
+    thread.start()
+    time.sleep(0.05)
+    latencies.clear()
+    start = time.perf_counter()
+    fn(value)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    print(f"{label:<8} {elapsed:>9.2f} {len(latencies):>12} {max(latencies) * 1000:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mib", type=int, default=50, help="size of the big string")
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stage_1.settings')
+    import django
+    django.setup()
+    from analyzer.analysis import analyze
+    from analyzer.offload import analysis_pool
+
+    rng = random.Random(0)
+    words = ["alpha", "beta", "gamma", "delta", "épsilon", "z"]
+    value = " ".join(rng.choices(words, k=args.mib * 1024 * 1024 // 6))
+    analysis_pool.executor.submit(len, "").result()  # start the workers outside the timing
+
+    print(f"{'path':<8} {'big s':>9} {'small done':>12} {'small max ms':>14}")
+    run("inline", analyze, value)
+    run("pool", analysis_pool.analyze, value)
+    analysis_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Building list responses from .values() projections against model instances:
+model rows + to_representation(), project() + format_rows() with every
+field, and the same projection without character_frequency_map.
+
+    cd stage_1
+    python -m benchmarks.projection --rows 20000
+"""
+import argparse
+import time
+
+from benchmarks.django_setup import setup
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from analyzer.analysis import analyze
+    from analyzer.filters import REPRESENTATION_FIELDS, format_rows, parse_fields, project
+    from analyzer.models import AnalyzedString, bulk_create_strings
+
+    values = [f"benchmark string number {i} with a few words" for i in range(args.rows)]
+    bulk_create_strings([AnalyzedString(value=v, **analyze(v)) for v in values], batch_size=5000)
+
+    # a fresh queryset per run, so no case is served from _result_cache
+    qs = AnalyzedString.objects
+    slim = parse_fields("value,length,is_palindrome,word_count,created_at")
+    cases = {
+        "models + to_representation": lambda: [o.to_representation() for o in qs.all()],
+        "values + format_rows": lambda: format_rows(project(qs.all(), REPRESENTATION_FIELDS), REPRESENTATION_FIELDS),
+        "values, no frequency map": lambda: format_rows(project(qs.all(), slim), slim),
+    }
+    print(f"{'path':<28} {'ms':>9}")
+    for name, fn in cases.items():
+        print(f"{name:<28} {best_of(fn, args.repeat) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+GET /strings/stats from the StringStat counters against computing the same
+numbers with aggregate queries over the strings, as the table grows. The
+counters should stay flat; the scan grows with the row count.
+
+    cd stage_1
+    python -m benchmarks.stats --steps 5000,20000,50000
+"""
+import argparse
+import time
+
+from benchmarks.django_setup import setup
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", default="5000,20000,50000", help="table sizes to measure at")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from django.db.models import Count, Sum
+    from analyzer.analysis import analyze
+    from analyzer.models import AnalyzedString, StringCharacter, StringStat, bulk_create_strings
+    from analyzer.stats import summarize
+
+    def from_counters():
+        return summarize(StringStat.objects.values_list('kind', 'key', 'count'))
+
+    def from_scan():
+        strings = AnalyzedString.objects.order_by()
+        return (
+            strings.count(),
+            list(strings.values('is_palindrome').annotate(n=Count('id'))),
+            list(strings.values('length').annotate(n=Count('id'))),
+            list(strings.values('word_count').annotate(n=Count('id'))),
+            list(StringCharacter.objects.values('char').annotate(n=Sum('count'))),
+        )
+
+    print(f"{'rows':>8} {'counters ms':>12} {'scan ms':>9}")
+    rows = 0
+    for step in (int(x) for x in args.steps.split(",")):
+        values = [f"stats benchmark string {i} with some words" for i in range(rows, step)]
+        bulk_create_strings([AnalyzedString(value=v, **analyze(v)) for v in values], batch_size=5000)
+        rows = step
+        counters = best_of(from_counters, args.repeat) * 1000
+        scan = best_of(from_scan, args.repeat) * 1000
+        print(f"{rows:>8} {counters:>12.2f} {scan:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
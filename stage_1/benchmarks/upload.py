@@ -0,0 +1,85 @@
+"""
+Peak Python memory of POST /strings/upload as the upload grows. The body is
+generated lazily (it is never held in memory by the benchmark itself), so
+the peak is what the view needs: it should stay flat, bounded by
+ANALYZER_UPLOAD_CHUNK_SIZE and the in-memory spool, not by the upload size.
+Each size is uploaded twice, once timed and once under tracemalloc (which
+slows it down too much to time).
+
+    cd stage_1
+    python -m benchmarks.upload --sizes 4,16,64
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.django_setup import setup
+
+LINE = "the quick brown fox jumps over the lazy dog — ünïcode\n".encode("utf-8")
+
+
+class GeneratedBody:
+    """A wsgi.input that produces `salt` and then `size` bytes of text on demand."""
+
+    def __init__(self, size, salt):
+        self.remaining = size
+        self.head = salt.encode("utf-8")  # makes each upload a new string
+        self.block = LINE * 4096
+
+    def read(self, n=-1):
+        if self.head:
+            data, self.head = self.head, b""
+            return data
+        if n is None or n < 0:
+            n = self.remaining
+        n = min(n, self.remaining, len(self.block))
+        self.remaining -= n
+        return self.block[:n]
+
+    def readline(self, *args):
+        return self.read(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="4,16,64", help="upload sizes in MiB")
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIRequest
+    from analyzer.views import UploadStringView
+
+    media_root = tempfile.TemporaryDirectory()
+    settings.MEDIA_ROOT = media_root.name
+    view = UploadStringView.as_view()
+
+    def upload(size, salt):
+        body = GeneratedBody(size, salt)
+        request = WSGIRequest({
+            "REQUEST_METHOD": "POST", "PATH_INFO": "/strings/upload", "SERVER_NAME": "bench",
+            "SERVER_PORT": "80", "CONTENT_TYPE": "text/plain", "CONTENT_LENGTH": str(size + len(body.head)),
+            "wsgi.input": body, "wsgi.url_scheme": "http",
+        })
+        response = view(request)
+        assert response.status_code == 201, response.status_code
+
+    print(f"{'MiB':>6} {'seconds':>8} {'MiB/s':>7} {'peak MiB':>9}")
+    for mib in (int(x) for x in args.sizes.split(",")):
+        size = mib * 1024 * 1024
+        # cut on a line boundary so the body stays valid UTF-8
+        size -= size % len(LINE)
+        start = time.perf_counter()
+        upload(size, salt=f"timed {mib}\n")
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        upload(size, salt=f"traced {mib}\n")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{mib:>6} {elapsed:>8.2f} {mib / elapsed:>7.1f} {peak / 2**20:>9.1f}")
+    media_root.cleanup()
+
+
+if __name__ == "__main__":
+    main()
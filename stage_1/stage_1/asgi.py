@@ -9,8 +9,20 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stage_1.settings')
+# serve the string endpoints with the native async views
+os.environ.setdefault('ANALYZER_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+# WhiteNoise is off under the async views (see settings.py) and has no ASGI
+# app, so in production the front proxy serves STATIC_ROOT (filled by
+# collectstatic) at STATIC_URL. Django's own static view is for development
+# only, so it is used only with DEBUG on.
+if settings.DEBUG:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+    application = ASGIStaticFilesHandler(application)
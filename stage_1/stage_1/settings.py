@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analyzer.middleware.body_size_limit',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -119,8 +121,73 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+# collectstatic target: WhiteNoise serves it under WSGI, the front proxy under ASGI
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Uploaded files: values of POST /strings/upload too large to keep in the database
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem is per process, and so is the query cache's generation counter
+# (analyzer/cache.py): a create or delete handled by one worker invalidates
+# only that worker's cached /strings and natural-language results, and the
+# other workers keep serving their stale ones for up to
+# ANALYZER_QUERY_CACHE_TIMEOUT. With more than one worker, use a shared
+# backend (Redis, Memcached, or FileBasedCache on a shared directory) so
+# every worker sees every bump.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'stage_1',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+
+
+# Analyzer app
+# Per-process LRU of recently read string representations (GET /strings/{value}, /strings/by-hash/{sha})
+ANALYZER_REPRESENTATION_CACHE_SIZE = 1024
+ANALYZER_REPRESENTATION_CACHE_TTL = 30  # seconds; bounds how long other workers serve a deleted string
+# Result cache for GET /strings and /strings/filter-by-natural-language
+ANALYZER_QUERY_CACHE_ALIAS = 'default'
+ANALYZER_QUERY_CACHE_TIMEOUT = 60  # seconds; with locmem, also how long other workers may serve stale results
+ANALYZER_QUERY_CACHE_MAX_ROWS = 1000  # larger results are not cached
+# Requests with a larger body get 413 (analyzer.middleware.body_size_limit).
+# Django's own cap on request.body is raised to match; its 2.5 MB default
+# would otherwise reject big strings first, with a 400.
+ANALYZER_MAX_BODY_SIZE = 64 * 1024 * 1024
+DATA_UPLOAD_MAX_MEMORY_SIZE = ANALYZER_MAX_BODY_SIZE
+# POST /strings/upload: bodies up to ANALYZER_MAX_UPLOAD_SIZE, read and analysed
+# ANALYZER_UPLOAD_CHUNK_SIZE bytes at a time; values over ANALYZER_UPLOAD_INLINE_MAX
+# bytes are stored under MEDIA_ROOT instead of in the value column.
+ANALYZER_MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+ANALYZER_UPLOAD_CHUNK_SIZE = 64 * 1024
+ANALYZER_UPLOAD_INLINE_MAX = 1024 * 1024
+# Strings of at least this many characters are analysed in a process pool
+# (analyzer/offload.py) instead of the request thread.
+ANALYZER_OFFLOAD_THRESHOLD = 1024 * 1024
+ANALYZER_OFFLOAD_WORKERS = 2
+ANALYZER_OFFLOAD_CHUNK_SIZE = 1024 * 1024
+# Store character_frequency_map packed (analyzer/frequency.py) instead of as a
+# JSON object: a fraction of the size, and cheaper to decode. Migration 0006
+# converts existing rows to match; analyzer.frequency.convert_rows() converts
+# them after a later switch (reads handle both formats either way).
+ANALYZER_COMPACT_FREQUENCY_MAP = os.environ.get('ANALYZER_COMPACT_FREQUENCY_MAP', '0') == '1'
+# Route the string endpoints to the native async views (analyzer/async_views.py).
+# asgi.py turns this on; WSGI keeps the DRF views.
+ANALYZER_ASYNC_VIEWS = os.environ.get('ANALYZER_ASYNC_VIEWS', '0') == '1'
+if ANALYZER_ASYNC_VIEWS:
+    # WhiteNoiseMiddleware is sync-only; one sync middleware makes Django run
+    # the whole chain (and so every async view) in a thread. Static files are
+    # then served by the front proxy from STATIC_ROOT, or with DEBUG on by
+    # ASGIStaticFilesHandler (asgi.py).
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
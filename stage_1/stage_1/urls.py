@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -22,3 +24,5 @@ urlpatterns = [
     
     path('', include('analyzer.urls')),
 ]
+# uploaded values (value_url); only served when DEBUG is on
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
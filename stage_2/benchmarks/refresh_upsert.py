@@ -0,0 +1,67 @@
+"""
+Writing a refresh's countries: one update_or_create(name__iexact=...) per
+country (the old loop) against upsert_countries(), on a fresh SQLite test
+database, first into an empty table and then over the existing rows.
+
+    cd stage_2
+    python -m benchmarks.refresh_upsert --countries 250
+"""
+import argparse
+import random
+import time
+
+from benchmarks.django_setup import setup
+
+
+def make_payload(count):
+    rng = random.Random(count)
+    codes = [f"C{i:02d}" for i in range(160)]
+    countries = [{
+        "name": f"Country {i}",
+        "capital": f"Capital {i}",
+        "region": rng.choice(["Africa", "Americas", "Asia", "Europe", "Oceania"]),
+        "population": rng.randint(10_000, 1_400_000_000),
+        "flag": f"https://flags.example/{i}.svg",
+        "currencies": [{"code": rng.choice(codes)}] if i % 25 else [],
+    } for i in range(count)]
+    rates = {code: rng.uniform(0.1, 5000) for code in codes}
+    return countries, rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from countries.models import Country
+    from countries.utils import build_country_rows, upsert_countries
+
+    def update_or_create_loop(rows):
+        for row in rows:
+            Country.objects.update_or_create(name__iexact=row['name'], defaults=row)
+
+    countries, rates = make_payload(args.countries)
+    print(f"{'path':<22} {'table':<9} {'ms':>8} {'queries':>8}")
+    for name, write in (("update_or_create loop", update_or_create_loop), ("upsert_countries", upsert_countries)):
+        for table in ("empty", "populated"):
+            best, queries = float("inf"), 0
+            for _ in range(args.repeat):
+                if table == "empty":
+                    Country.objects.all().delete()
+                rows = build_country_rows(countries, rates, timezone.now())
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    with transaction.atomic():
+                        write(rows)
+                    best = min(best, time.perf_counter() - start)
+                queries = len(ctx.captured_queries)
+            print(f"{name:<22} {table:<9} {best * 1000:>8.1f} {queries:>8}")
+
+
+if __name__ == "__main__":
+    main()
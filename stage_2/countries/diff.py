@@ -0,0 +1,21 @@
+import hashlib
+import json
+
+# The Country fields a refresh compares; last_refreshed_at is left out, so
+# a refresh that brings nothing new leaves the row (and its timestamp) alone.
+HASHED_FIELDS = ['name', 'capital', 'region', 'population', 'currency_code',
+                 'exchange_rate', 'estimated_gdp', 'flag_url']
+_FLOAT_FIELDS = ('exchange_rate', 'estimated_gdp')
+
+
+def record_hash(row):
+    # sha256 of a country's HASHED_FIELDS, from a refresh row dict or a Country.
+    # Floats are normalised so a JSON 1 and the stored 1.0 hash alike.
+    get = row.get if isinstance(row, dict) else lambda field: getattr(row, field)
+    values = []
+    for field in HASHED_FIELDS:
+        value = get(field)
+        if field in _FLOAT_FIELDS and value is not None:
+            value = float(value)
+        values.append(value)
+    return hashlib.sha256(json.dumps(values).encode()).hexdigest()
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import namedtuple
+
+
+# content: the body bytes; sha256: their hash; changed: whether that hash
+# differs from the body last marked applied (always True without a cache)
+CachedResponse = namedtuple('CachedResponse', 'content sha256 changed')
+
+
+def _atomic_write(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HTTPCache:
+    # On-disk cache of upstream GET responses, one body file and one JSON
+    # metadata file per URL: the ETag / Last-Modified validators, an optional
+    # expiry (the exchange API's time_next_update_unix), the body's sha256
+    # and the sha256 of the body the database was last refreshed from.
+    #
+    # get() skips the request while the expiry is in the future, otherwise
+    # sends a conditional request and reuses the stored body on 304. Either
+    # way the caller learns whether the body differs from the applied one,
+    # and calls mark_applied() once it has written it, so a refresh that
+    # fails halfway is retried with the same body rather than skipped.
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()[:32]
+        base = os.path.join(self.directory, key)
+        return base + '.body', base + '.json'
+
+    def _load(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return {}, None
+
+    def get(self, session, url, timeout=10, expires=None):
+        # expires(content) -> unix time after which the body may have changed, or None
+        meta, content = self._load(url)
+        fresh = content is not None and meta.get('expires') and time.time() < meta['expires']
+        if not fresh:
+            headers = {}
+            if content is not None and meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if content is not None and meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+            r = session.get(url, timeout=timeout, headers=headers)
+            if r.status_code != 304:
+                r.raise_for_status()
+                content = r.content
+                meta['sha256'] = hashlib.sha256(content).hexdigest()
+                meta['expires'] = expires(content) if expires else None
+                _atomic_write(self._paths(url)[0], content)
+            # a 304 may carry updated validators too
+            meta['etag'] = r.headers.get('ETag', meta.get('etag'))
+            meta['last_modified'] = r.headers.get('Last-Modified', meta.get('last_modified'))
+            meta['url'] = url
+            _atomic_write(self._paths(url)[1], json.dumps(meta).encode())
+        return CachedResponse(content, meta['sha256'], meta['sha256'] != meta.get('applied_sha256'))
+
+    def mark_applied(self, url, sha256):
+        meta, content = self._load(url)
+        if content is not None:
+            meta['applied_sha256'] = sha256
+            _atomic_write(self._paths(url)[1], json.dumps(meta).encode())
@@ -0,0 +1,144 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RefreshStatus
+from .utils import refresh_and_cache_all
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = (RefreshStatus.QUEUED, RefreshStatus.RUNNING)
+# refresh_and_cache_all() result keys kept on the job (the rest is not JSON)
+RESULT_KEYS = ('total', 'changed', 'inserted', 'updated', 'unchanged', 'removed')
+
+# API-started jobs run here, one at a time, off the request thread
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='countries-refresh')
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _lock_expiry(now):
+    return now + timedelta(seconds=getattr(settings, 'REFRESH_LOCK_TIMEOUT', 600))
+
+
+def _status_row():
+    return RefreshStatus.objects.filter(id=1)
+
+
+def request_refresh():
+    # Queue a refresh job unless one is already queued or running (with an
+    # unexpired lock). Returns (job_id, queued): the new job's id, or the id
+    # of the job already holding the lock and False.
+    RefreshStatus.objects.get_or_create(id=1)
+    now = timezone.now()
+    job_id = uuid.uuid4()
+    free = ~Q(state__in=ACTIVE_STATES) | Q(locked_until__lt=now)
+    # a conditional UPDATE: of concurrent callers exactly one matches the row
+    claimed = _status_row().filter(free).update(
+        job_id=job_id, state=RefreshStatus.QUEUED, requested_at=now, started_at=None,
+        finished_at=None, locked_until=_lock_expiry(now), error='', result=None,
+    )
+    if claimed:
+        return job_id, True
+    return _status_row().values_list('job_id', flat=True).get(), False
+
+
+def run_job(job_id, force=False):
+    # Run the queued job `job_id` in this thread, recording its progress on
+    # RefreshStatus. Returns the job's final status (see job_status()), or
+    # None if `job_id` is not the queued job.
+    now = timezone.now()
+    started = _status_row().filter(job_id=job_id, state=RefreshStatus.QUEUED).update(
+        state=RefreshStatus.RUNNING, started_at=now, locked_until=_lock_expiry(now))
+    if not started:
+        return None
+    job = _status_row().filter(job_id=job_id)
+    try:
+        result = refresh_and_cache_all(force=force)
+    except Exception as exc:
+        logger.exception("countries refresh job %s failed", job_id)
+        job.update(state=RefreshStatus.FAILED, error=f"{type(exc).__name__}: {exc}",
+                   finished_at=timezone.now(), locked_until=None)
+    else:
+        job.update(state=RefreshStatus.SUCCEEDED, result={key: result[key] for key in RESULT_KEYS},
+                   finished_at=timezone.now(), locked_until=None)
+    return job_status(job_id)
+
+
+def _run_in_background(job_id, force):
+    try:
+        run_job(job_id, force)
+    finally:
+        # this thread's connection would otherwise stay open for good
+        connection.close()
+
+
+def start_refresh(force=False):
+    # Queue a refresh and hand it to the background worker thread. Returns
+    # (job_id, queued) as request_refresh() does; nothing new is started
+    # while another job holds the lock.
+    job_id, queued = request_refresh()
+    if queued:
+        _executor.submit(_run_in_background, job_id, force)
+    return job_id, queued
+
+
+def job_status(job_id):
+    # The job `job_id` as a dict for the API, or None once a newer job has
+    # replaced it (only the latest job is kept).
+    status = _status_row().filter(job_id=job_id).first()
+    if status is None:
+        return None
+    return {
+        'job_id': str(status.job_id),
+        'state': status.state,
+        'requested_at': status.requested_at,
+        'started_at': status.started_at,
+        'finished_at': status.finished_at,
+        'error': status.error or None,
+        'result': status.result,
+    }
+
+
+def refresh_due(interval):
+    # True when no refresh was requested in the last `interval` seconds.
+    # Every process's scheduler asks this, so together they refresh about
+    # once per interval rather than once per process.
+    requested_at = _status_row().values_list('requested_at', flat=True).first()
+    return requested_at is None or timezone.now() - requested_at >= timedelta(seconds=interval)
+
+
+def _schedule(interval, stop):
+    # check a few times per interval so a process that starts mid-interval keeps the cadence
+    while not stop.wait(min(interval / 4, 60)):
+        close_old_connections()
+        try:
+            if refresh_due(interval):
+                start_refresh()
+        except Exception:
+            logger.exception("countries refresh scheduler failed")
+
+
+def start_scheduler(interval=None):
+    # Start the in-process scheduler thread (once per process), refreshing
+    # every `interval` seconds (REFRESH_SCHEDULE_INTERVAL by default; 0 or
+    # unset leaves it off). Returns the threading.Event that stops it.
+    if interval is None:
+        interval = getattr(settings, 'REFRESH_SCHEDULE_INTERVAL', 0)
+    if not interval:
+        return None
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            stop = threading.Event()
+            threading.Thread(target=_schedule, args=(interval, stop), daemon=True,
+                             name='countries-refresh-scheduler').start()
+            _scheduler = stop
+        return _scheduler
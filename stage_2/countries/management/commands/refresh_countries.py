@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from countries.jobs import request_refresh, run_job
+from countries.models import RefreshStatus
+
+
+class Command(BaseCommand):
+    help = ("Refresh countries and exchange rates in this process, recording the job on RefreshStatus. "
+            "Exits with an error if another refresh holds the lock.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="write to the database even if neither upstream response changed")
+        parser.add_argument('--every', type=int, metavar='SECONDS',
+                            help="keep running, refreshing every SECONDS (for a dedicated worker)")
+
+    def handle(self, *args, force=False, every=None, **options):
+        if every is None:
+            self.refresh(force)
+            return
+        while True:
+            try:
+                self.refresh(force)
+            except CommandError as exc:
+                self.stderr.write(str(exc))
+            time.sleep(every)
+
+    def refresh(self, force):
+        job_id, queued = request_refresh()
+        if not queued:
+            raise CommandError(f"refresh {job_id} is already queued or running")
+        status = run_job(job_id, force=force)
+        if status['state'] == RefreshStatus.FAILED:
+            raise CommandError(f"refresh {job_id} failed: {status['error']}")
+        result = status['result']
+        self.stdout.write(
+            f"refresh {job_id}: {result['total']} countries "
+            f"({result['inserted']} inserted, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged, {result['removed']} removed)"
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+from countries.diff import record_hash
+
+
+def hash_existing_countries(apps, schema_editor):
+    Country = apps.get_model('countries', 'Country')
+    countries = list(Country.objects.all())
+    for country in countries:
+        country.record_hash = record_hash(country)
+    Country.objects.bulk_update(countries, ['record_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('countries', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='country',
+            name='record_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(hash_existing_countries, migrations.RunPython.noop),
+    ]
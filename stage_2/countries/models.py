@@ -12,6 +12,8 @@ class Country(models.Model):
     estimated_gdp = models.FloatField(blank=True, null=True)
     flag_url = models.URLField(blank=True, null=True)
     last_refreshed_at = models.DateTimeField(default=timezone.now)
+    # diff.record_hash() of the refreshed fields, to spot rows a refresh would not change
+    record_hash = models.CharField(max_length=64, blank=True, default='')
 
 
     def __str__(self):
@@ -19,15 +21,36 @@ class Country(models.Model):
 
 
 class RefreshStatus(models.Model):
+    # Single row (id=1): the outcome of the last refresh, plus the state of
+    # the latest refresh job (countries/jobs.py). Claiming the row for a job
+    # is a conditional UPDATE, which makes it the lock that keeps refreshes
+    # one at a time across threads and processes; locked_until lets a job
+    # whose worker died be taken over.
+    IDLE = 'idle'
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATES = [(IDLE, 'Idle'), (QUEUED, 'Queued'), (RUNNING, 'Running'),
+              (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
     last_refreshed_at = models.DateTimeField(null=True, blank=True)
     total_countries = models.IntegerField(default=0)
+    job_id = models.UUIDField(null=True, blank=True)
+    state = models.CharField(max_length=16, choices=STATES, default=IDLE)
+    requested_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    result = models.JSONField(null=True, blank=True)
 
 
-class Meta:
-    # Ensure a single row
-    verbose_name = "Refresh Status"
-    verbose_name_plural = "Refresh Status"
+    class Meta:
+        # Ensure a single row
+        verbose_name = "Refresh Status"
+        verbose_name_plural = "Refresh Status"
 
 
     def __str__(self):
-        return f"Refreshed: {self.last_refreshed_at} (total={self.total_countries})"
\ No newline at end of file
+        return f"Refreshed: {self.last_refreshed_at} (total={self.total_countries})"
@@ -1,3 +1,259 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .jobs import request_refresh, run_job
+from .models import Country, RefreshStatus
+from .utils import (
+    COUNTRIES_API, EXCHANGE_API, build_country_rows, build_session, fetch_countries_data,
+    fetch_upstream, parse_exchange_rates, refresh_and_cache_all, upsert_countries,
+)
+
+COUNTRIES = [
+    {"name": "Nigeria", "capital": "Abuja", "region": "Africa", "population": 206139589,
+     "flag": "https://flagcdn.com/ng.svg", "currencies": [{"code": "NGN"}]},
+    {"name": "Ghana", "capital": "Accra", "region": "Africa", "population": 31072940,
+     "flag": "https://flagcdn.com/gh.svg", "currencies": [{"code": "GHS"}]},
+    {"name": "Antarctica", "region": "Polar", "population": 1000},
+]
+RATES = {"NGN": 1600.0, "GHS": 15.0}
+
+
+class UpsertCountriesTests(TestCase):
+    def test_creates_then_updates_by_case_insensitive_name(self):
+        with self.assertNumQueries(2):
+            result = upsert_countries(build_country_rows(COUNTRIES, RATES, timezone.now()))
+        self.assertEqual(result, {"inserted": 3, "updated": 0, "unchanged": 0, "removed": 0})
+        nigeria = Country.objects.get(name="Nigeria")
+        self.assertEqual((nigeria.currency_code, nigeria.exchange_rate), ("NGN", 1600.0))
+        self.assertEqual(Country.objects.get(name="Antarctica").estimated_gdp, 0)
+
+        renamed = [dict(COUNTRIES[0], name="NIGERIA", population=1)]
+        result = upsert_countries(build_country_rows(renamed, RATES, timezone.now()))
+        self.assertEqual(result, {"inserted": 0, "updated": 1, "unchanged": 0, "removed": 0})
+        self.assertEqual(Country.objects.count(), 3)
+        updated = Country.objects.get(pk=nigeria.pk)
+        self.assertEqual((updated.name, updated.population), ("NIGERIA", 1))
+
+    @override_settings(REFRESH_STABLE_GDP=True)
+    def test_only_changed_rows_are_written(self):
+        upsert_countries(build_country_rows(COUNTRIES, RATES, timezone.now()))
+        before = {c.name: c.last_refreshed_at for c in Country.objects.all()}
+
+        changed = [COUNTRIES[0], dict(COUNTRIES[1], capital="Kumasi"), {"name": "Togo", "population": 8}]
+        with self.assertNumQueries(4):  # select, upsert of updated rows, insert of new ones, delete
+            result = upsert_countries(build_country_rows(changed, RATES, timezone.now()), remove_missing=True)
+        self.assertEqual(result, {"inserted": 1, "updated": 1, "unchanged": 1, "removed": 1})
+        after = {c.name: c.last_refreshed_at for c in Country.objects.all()}
+        self.assertEqual(after["Nigeria"], before["Nigeria"])
+        self.assertGreater(after["Ghana"], before["Ghana"])
+        self.assertNotIn("Antarctica", after)
+
+        with self.assertNumQueries(1):
+            result = upsert_countries(build_country_rows(changed, RATES, timezone.now()))
+        self.assertEqual(result["unchanged"], 3)
+
+
+class StubAdapter(requests.adapters.BaseAdapter):
+    """
+    Transport answering each URL with canned JSON, and with 304 to an
+    If-None-Match of the URL's entry in `etags`. `barrier` holds every
+    request until all are in flight.
+    """
+
+    def __init__(self, routes, barrier=None, etags=None):
+        super().__init__()
+        self.routes = routes
+        self.barrier = barrier
+        self.etags = etags or {}
+        self.requests = []
+
+    @property
+    def urls(self):
+        return [request.url for request in self.requests]
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        response = requests.Response()
+        etag = self.etags.get(request.url)
+        if etag is not None:
+            response.headers['ETag'] = etag
+        if etag is not None and request.headers.get('If-None-Match') == etag:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response.headers['Content-Type'] = 'application/json'
+            response._content = json.dumps(self.routes[request.url]).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def stub_session(barrier=None, etags=None, rates_body=None):
+    rates_body = rates_body or {"result": "success", "rates": RATES}
+    adapter = StubAdapter({COUNTRIES_API: COUNTRIES, EXCHANGE_API: rates_body}, barrier, etags)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+class FetchUpstreamTests(TestCase):
+    def test_fetches_run_concurrently(self):
+        # a sequential fetch would leave the first request waiting at the barrier
+        session, adapter = stub_session(threading.Barrier(2))
+        countries, rates = fetch_upstream(session=session)
+        self.assertEqual(json.loads(countries.content), COUNTRIES)
+        self.assertEqual(parse_exchange_rates(rates.content), RATES)
+        self.assertEqual(sorted(adapter.urls), sorted([COUNTRIES_API, EXCHANGE_API]))
+
+    def test_refresh_writes_after_both_fetches(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        session, _ = stub_session()
+        with override_settings(CACHE_DIR=cache_dir), mock.patch('countries.utils.get_session', return_value=session):
+            result = refresh_and_cache_all()
+        self.assertEqual(result['total'], 3)
+        self.assertEqual(RefreshStatus.objects.get(id=1).total_countries, 3)
+
+    @override_settings(REFRESH_HTTP_RETRIES=2, REFRESH_HTTP_BACKOFF=0)
+    def test_session_retries_server_errors(self):
+        statuses = [503, 200]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status = statuses.pop(0)
+                body = json.dumps(COUNTRIES).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with mock.patch('countries.utils.COUNTRIES_API', f'http://127.0.0.1:{server.server_port}/all'):
+            self.assertEqual(fetch_countries_data(session=build_session()), COUNTRIES)
+        self.assertEqual(statuses, [])
+
+
+class UpstreamCacheTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings = override_settings(CACHE_DIR=cache_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def refresh(self, session):
+        with mock.patch('countries.utils.get_session', return_value=session):
+            return refresh_and_cache_all()
+
+    def test_not_modified_skips_the_database(self):
+        session, adapter = stub_session(etags={COUNTRIES_API: '"v1"', EXCHANGE_API: '"r1"'})
+        self.assertTrue(self.refresh(session)['changed'])
+        with self.assertNumQueries(1):
+            result = self.refresh(session)
+        self.assertEqual((result['changed'], result['total']), (False, 3))
+        # the two fetches run in threads, so pick the requests out by URL
+        last = {request.url: request for request in adapter.requests}
+        self.assertEqual(last[COUNTRIES_API].headers['If-None-Match'], '"v1"')
+        self.assertEqual(last[EXCHANGE_API].headers['If-None-Match'], '"r1"')
+
+    def test_unexpired_rates_and_identical_body_skip_the_database(self):
+        rates_body = {"result": "success", "rates": RATES, "time_next_update_unix": 2 ** 40}
+        session, adapter = stub_session(rates_body=rates_body)
+        self.refresh(session)
+        self.assertFalse(self.refresh(session)['changed'])
+        # the exchange table is not asked for again before time_next_update_unix
+        self.assertEqual(adapter.urls.count(EXCHANGE_API), 1)
+        self.assertEqual(adapter.urls.count(COUNTRIES_API), 2)
+
+        adapter.routes[COUNTRIES_API] = COUNTRIES[:2]
+        self.assertTrue(self.refresh(session)['changed'])
+
+    def test_failed_write_is_retried_with_the_same_body(self):
+        session, _ = stub_session(etags={COUNTRIES_API: '"v1"', EXCHANGE_API: '"r1"'})
+        with mock.patch('countries.utils.upsert_countries', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.refresh(session)
+        self.assertTrue(self.refresh(session)['changed'])
+        self.assertEqual(Country.objects.count(), 3)
+
+
+class RefreshJobTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings = override_settings(CACHE_DIR=cache_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        session, _ = stub_session()
+        for patcher in (mock.patch('countries.utils.get_session', return_value=session),
+                        mock.patch('countries.jobs._executor')):
+            self.executor = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_post_returns_202_and_job_can_be_polled(self):
+        response = self.client.post('/countries/refresh')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual(response["Location"], f"/countries/refresh/{job_id}")
+        self.assertEqual(self.client.get(f"/countries/refresh/{job_id}").json()["state"], "queued")
+        self.executor.submit.assert_called_once()
+
+        # one refresh at a time: a second request gets the queued job back
+        again = self.client.post('/countries/refresh').json()
+        self.assertEqual((again["job_id"], again["queued"]), (job_id, False))
+
+        run_job(job_id)
+        job = self.client.get(f"/countries/refresh/{job_id}").json()
+        self.assertEqual(job["state"], "succeeded")
+        self.assertEqual(job["result"], {"total": 3, "changed": True, "inserted": 3, "updated": 0,
+                                         "unchanged": 0, "removed": 0})
+        self.assertNotEqual(self.client.post('/countries/refresh').json()["job_id"], job_id)
+        self.assertEqual(self.client.get(f"/countries/refresh/{job_id}").status_code, 404)
+
+    def test_failed_job_releases_the_lock(self):
+        job_id, _ = request_refresh()
+        with mock.patch('countries.jobs.refresh_and_cache_all', side_effect=ValueError("boom")), \
+                self.assertLogs('countries.jobs', 'ERROR'):
+            status = run_job(job_id)
+        self.assertEqual((status["state"], status["error"]), ("failed", "ValueError: boom"))
+        self.assertTrue(request_refresh()[1])
+
+    def test_expired_lock_is_taken_over(self):
+        stale, _ = request_refresh()
+        self.assertFalse(request_refresh()[1])
+        RefreshStatus.objects.filter(id=1).update(locked_until=timezone.now() - timedelta(seconds=1))
+        job_id, queued = request_refresh()
+        self.assertTrue(queued)
+        self.assertIsNone(run_job(stale))
+
+    def test_management_command(self):
+        out = io.StringIO()
+        call_command('refresh_countries', stdout=out)
+        self.assertIn("3 countries (3 inserted, 0 updated, 0 unchanged, 0 removed)", out.getvalue())
+        request_refresh()
+        with self.assertRaisesMessage(CommandError, "already queued or running"):
+            call_command('refresh_countries')
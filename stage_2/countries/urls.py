@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import RefreshJobView, RefreshView
+
+urlpatterns = [
+    path('countries/refresh', RefreshView.as_view(), name='refresh_countries'),                       # POST
+    path('countries/refresh/<uuid:job_id>', RefreshJobView.as_view(), name='refresh_job'),            # GET
+]
@@ -1,10 +1,18 @@
-from time import timezone
+import hashlib
+import json
 import requests
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from datetime import datetime
+from .diff import record_hash
+from .http_cache import CachedResponse, HTTPCache
 from .models import Country, RefreshStatus
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
 from PIL import Image, ImageDraw, ImageFont
 import os
 
@@ -15,18 +23,59 @@ EXCHANGE_API = 'https://open.er-api.com/v6/latest/USD'
 
 
 
-def fetch_countries_data(timeout=10):
-    r = requests.get(COUNTRIES_API, timeout=timeout)
-    r.raise_for_status()
-    return r.json()
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session():
+    # A requests.Session whose connection pool keeps upstream connections
+    # alive between refreshes, retrying connection errors and 429/5xx
+    # responses with exponential backoff (REFRESH_HTTP_RETRIES/_BACKOFF).
+    retry = Retry(
+        total=getattr(settings, 'REFRESH_HTTP_RETRIES', 3),
+        backoff_factor=getattr(settings, 'REFRESH_HTTP_BACKOFF', 0.5),
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    # The process-wide session every fetch shares (Session is safe to use
+    # from the refresh's fetch threads).
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+
 
+def upstream_cache():
+    # The on-disk cache of upstream responses (http_cache.py), under CACHE_DIR.
+    return HTTPCache(os.path.join(settings.CACHE_DIR, 'http'))
 
 
 
-def fetch_exchange_rates(timeout=10):
-    r = requests.get(EXCHANGE_API, timeout=timeout)
+
+def _get(url, timeout, session, cache, expires=None):
+    session = session or get_session()
+    if cache is not None:
+        return cache.get(session, url, timeout=timeout, expires=expires)
+    r = session.get(url, timeout=timeout)
     r.raise_for_status()
-    data = r.json()
+    return CachedResponse(r.content, hashlib.sha256(r.content).hexdigest(), True)
+
+
+
+
+def parse_exchange_rates(content):
+    data = json.loads(content)
     # expected structure: { 'result': 'success', 'rates': {...} }
     rates = data.get('rates')
     if rates is None:
@@ -36,10 +85,43 @@ def fetch_exchange_rates(timeout=10):
 
 
 
-def generate_estimated_gdp(population, exchange_rate):
+def _exchange_rates_expiry(content):
+    # the exchange API says when its table next changes; no need to ask before then
+    return json.loads(content).get('time_next_update_unix')
+
+
+
+
+def fetch_countries_data(timeout=10, session=None, cache=None):
+    return json.loads(_get(COUNTRIES_API, timeout, session, cache).content)
+
+
+
+
+def fetch_exchange_rates(timeout=10, session=None, cache=None):
+    return parse_exchange_rates(_get(EXCHANGE_API, timeout, session, cache, _exchange_rates_expiry).content)
+
+
+
+
+def fetch_upstream(timeout=10, session=None, cache=None):
+    # Both upstream requests at once, so a refresh waits for the slower of
+    # the two rather than their sum. Returns the (countries, rates)
+    # CachedResponses once both are in; a failure of either is raised here.
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='refresh-fetch') as pool:
+        countries = pool.submit(_get, COUNTRIES_API, timeout, session, cache)
+        rates = pool.submit(_get, EXCHANGE_API, timeout, session, cache, _exchange_rates_expiry)
+        return countries.result(), rates.result()
+
+
+
+
+def generate_estimated_gdp(population, exchange_rate, seed=None):
+    # With a seed (the country name, under REFRESH_STABLE_GDP) the multiplier
+    # is the same on every refresh, so unchanged inputs give an unchanged GDP.
     if population is None or exchange_rate in (None, 0):
         return None
-    multiplier = random.randint(1000, 2000)
+    multiplier = (random.Random(seed) if seed is not None else random).randint(1000, 2000)
     return (population * multiplier) / exchange_rate
 
 
@@ -80,15 +162,16 @@ def generate_summary_image(total, top_five, timestamp):
     image.save(file_path)
     return file_path
 
-@transaction.atomic
-def refresh_and_cache_all():
-    # This function fetches external data and updates DB in a single transaction.
-    # It will raise exceptions if external API calls fail.
-    countries_json = fetch_countries_data()
-    rates = fetch_exchange_rates()
+# Country fields a refresh writes (everything but the primary key)
+REFRESH_FIELDS = ['name', 'capital', 'region', 'population', 'currency_code',
+                  'exchange_rate', 'estimated_gdp', 'flag_url', 'last_refreshed_at']
 
 
-    updated_count = 0
+def build_country_rows(countries_json, rates, refreshed_at):
+    # One dict of REFRESH_FIELDS per country in the countries API payload,
+    # with the exchange rate and estimated GDP filled in from `rates`.
+    stable_gdp = getattr(settings, 'REFRESH_STABLE_GDP', False)
+    rows = []
     for item in countries_json:
         name = item.get('name')
         capital = item.get('capital')
@@ -114,7 +197,8 @@ def refresh_and_cache_all():
                 if exchange_rate in (None,):
                     exchange_rate = None
                 if exchange_rate not in (None,):
-                    estimated_gdp = generate_estimated_gdp(population, exchange_rate)
+                    estimated_gdp = generate_estimated_gdp(population, exchange_rate,
+                                                           seed=name if stable_gdp else None)
                 else:
                     estimated_gdp = None
         else:
@@ -124,29 +208,103 @@ def refresh_and_cache_all():
             estimated_gdp = 0
 
 
-        # Upsert by case-insensitive name
-        obj, created = Country.objects.update_or_create(
-            name__iexact=name,
-            defaults={
-                'name': name,
-                'capital': capital,
-                'region': region,
-                'population': population,
-                'currency_code': currency_code,
-                'exchange_rate': exchange_rate,
-                'estimated_gdp': estimated_gdp,
-                'flag_url': flag_url,
-                'last_refreshed_at': timezone.now(),
-            }
-        )
-        updated_count += 1
-
-
-    # Update RefreshStatus (single record). Create or update.
-    status, _ = RefreshStatus.objects.get_or_create(id=1)
-    status.last_refreshed_at = timezone.now()
-    status.total_countries = Country.objects.count()
-    status.save()
+        rows.append({
+            'name': name,
+            'capital': capital,
+            'region': region,
+            'population': population,
+            'currency_code': currency_code,
+            'exchange_rate': exchange_rate,
+            'estimated_gdp': estimated_gdp,
+            'flag_url': flag_url,
+            'last_refreshed_at': refreshed_at,
+        })
+    return rows
+
+
+def upsert_countries(rows, batch_size=500, remove_missing=False):
+    # Bring Country in line with `rows`, matching existing countries by
+    # case-insensitive name (as update_or_create(name__iexact=...) did), in
+    # a handful of queries: one SELECT of every country's name and
+    # record_hash, then chunked bulk writes of only the rows whose hash
+    # changed. A later row with the same name wins. With `remove_missing`,
+    # countries absent from `rows` are deleted. Returns the
+    # inserted/updated/unchanged/removed counts.
+    existing = {c.name.lower(): c for c in Country.objects.only('id', 'name', 'record_hash')}
+    incoming = {}
+    for row in rows:
+        incoming[row['name'].lower()] = row
+
+    to_create, to_update, unchanged = [], [], 0
+    for key, row in incoming.items():
+        digest = record_hash(row)
+        country = existing.get(key)
+        if country is None:
+            to_create.append(Country(**row, record_hash=digest))
+        elif country.record_hash == digest:
+            unchanged += 1
+        else:
+            for field, value in row.items():
+                setattr(country, field, value)
+            country.record_hash = digest
+            to_update.append(country)
+
+    fields = REFRESH_FIELDS + ['record_hash']
+    if connection.features.supports_update_conflicts_with_target:
+        # existing rows carry their pk, so INSERT ... ON CONFLICT (id) DO UPDATE
+        # rewrites them in place, a renamed (re-cased) name included
+        Country.objects.bulk_create(to_update + to_create, batch_size=batch_size, update_conflicts=True,
+                                    unique_fields=['id'], update_fields=fields)
+    else:
+        Country.objects.bulk_create(to_create, batch_size=batch_size)
+        Country.objects.bulk_update(to_update, fields, batch_size=batch_size)
+
+    removed = 0
+    if remove_missing:
+        stale = [country.id for key, country in existing.items() if key not in incoming]
+        for start in range(0, len(stale), batch_size):
+            removed += Country.objects.filter(id__in=stale[start:start + batch_size]).delete()[0]
+    return {'inserted': len(to_create), 'updated': len(to_update), 'unchanged': unchanged, 'removed': removed}
+
+
+def refresh_and_cache_all(force=False):
+    # This function fetches external data, then updates the DB in a single transaction.
+    # It will raise exceptions if external API calls fail (before anything is written).
+    # When neither upstream body changed since the last refresh applied them
+    # (a 304, an unexpired exchange table or an identical body), the DB is
+    # left alone unless `force` is set.
+    cache = upstream_cache()
+    countries, rates = fetch_upstream(cache=cache)
+
+
+    status = RefreshStatus.objects.filter(id=1).first()
+    if not (force or countries.changed or rates.changed) and status is not None and status.last_refreshed_at:
+        image_path = os.path.join(settings.CACHE_DIR, 'summary.png')
+        if not os.path.exists(image_path):
+            top5 = Country.objects.exclude(estimated_gdp__isnull=True).order_by('-estimated_gdp')[:5]
+            image_path = generate_summary_image(status.total_countries, top5, status.last_refreshed_at.isoformat())
+        return {'total': status.total_countries, 'last_refreshed_at': status.last_refreshed_at,
+                'image_path': image_path, 'changed': False,
+                'inserted': 0, 'updated': 0, 'unchanged': status.total_countries, 'removed': 0}
+
+
+    countries_json = json.loads(countries.content)
+    rates_map = parse_exchange_rates(rates.content)
+    with transaction.atomic():
+        rows = build_country_rows(countries_json, rates_map, timezone.now())
+        # an empty payload is far likelier an upstream fault than a world without countries
+        counts = upsert_countries(rows, remove_missing=bool(rows))
+
+
+        # Update RefreshStatus (single record). Create or update.
+        status, _ = RefreshStatus.objects.get_or_create(id=1)
+        status.last_refreshed_at = timezone.now()
+        status.total_countries = Country.objects.count()
+        # the job fields on this row belong to jobs.py
+        status.save(update_fields=['last_refreshed_at', 'total_countries'])
+    # only now that they are committed are these the bodies the DB holds
+    cache.mark_applied(COUNTRIES_API, countries.sha256)
+    cache.mark_applied(EXCHANGE_API, rates.sha256)
 
 
     # Generate summary image
@@ -154,4 +312,5 @@ def refresh_and_cache_all():
     image_path = generate_summary_image(status.total_countries, top5, status.last_refreshed_at.isoformat())
 
 
-    return {'total': status.total_countries, 'last_refreshed_at': status.last_refreshed_at, 'image_path': image_path}
\ No newline at end of file
+    return {'total': status.total_countries, 'last_refreshed_at': status.last_refreshed_at,
+            'image_path': image_path, 'changed': True, **counts}
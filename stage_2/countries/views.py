@@ -1,3 +1,32 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .jobs import job_status, start_refresh
+
+
+class RefreshView(APIView):
+    """
+    POST /countries/refresh — start a refresh in the background and return
+    202 with its job id. While a refresh is queued or running, that job is
+    returned instead of starting another. ?force=true writes to the database
+    even when neither upstream response changed.
+    """
+    def post(self, request, *args, **kwargs):
+        force = request.query_params.get('force', '').lower() == 'true'
+        job_id, queued = start_refresh(force=force)
+        url = f"/countries/refresh/{job_id}"
+        body = {"job_id": str(job_id), "queued": queued, "status_url": url}
+        return Response(body, status=status.HTTP_202_ACCEPTED, headers={"Location": url})
+
+
+class RefreshJobView(APIView):
+    """
+    GET /countries/refresh/{job_id} — state of a refresh job: queued,
+    running, succeeded (with its counts) or failed (with the error).
+    """
+    def get(self, request, job_id, *args, **kwargs):
+        job = job_status(job_id)
+        if job is None:
+            return Response({"error": "Refresh job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
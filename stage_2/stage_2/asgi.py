@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stage_2.settings')
 
 application = get_asgi_application()
+
+# periodic countries refresh, when REFRESH_SCHEDULE_INTERVAL is set
+from countries.jobs import start_scheduler  # noqa: E402
+
+start_scheduler()
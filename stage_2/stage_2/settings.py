@@ -38,6 +38,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework',
+    'countries',
 ]
 
 MIDDLEWARE = [
@@ -124,6 +126,20 @@ MEDIA_URL = '/media/'
 CACHE_DIR = os.path.join(BASE_DIR, 'cache')
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# Upstream fetches in countries.utils: retries (with exponential backoff,
+# in seconds) for connection errors and 429/5xx responses
+REFRESH_HTTP_RETRIES = 3
+REFRESH_HTTP_BACKOFF = 0.5
+# Derive each country's random GDP multiplier from its name, so a refresh
+# with unchanged upstream data leaves estimated_gdp (and the row) unchanged
+REFRESH_STABLE_GDP = True
+# Refresh jobs (countries/jobs.py): a queued or running job holds the refresh
+# lock for at most REFRESH_LOCK_TIMEOUT seconds before another may take over.
+# With REFRESH_SCHEDULE_INTERVAL (seconds) set, the WSGI/ASGI process also
+# starts a refresh whenever the last one was requested longer ago than that.
+REFRESH_LOCK_TIMEOUT = 600
+REFRESH_SCHEDULE_INTERVAL = int(os.environ.get('REFRESH_SCHEDULE_INTERVAL', '0'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 